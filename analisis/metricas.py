@@ -1,11 +1,144 @@
 """
 Módulo de análisis y cálculo de métricas del sistema.
 """
+import csv
+import os
+from importlib.util import find_spec
+
 import pandas as pd
 import numpy as np
 from scipy import stats
 
 
+# Motores de pandas para escribir Parquet (dependencias opcionales)
+MOTORES_PARQUET = ('pyarrow', 'fastparquet')
+
+
+def _verificar_motor_parquet():
+    """Lanza ImportError con un mensaje claro si no hay motor de Parquet instalado."""
+    if not any(find_spec(motor) for motor in MOTORES_PARQUET):
+        raise ImportError(
+            "formato='parquet' requiere pyarrow o fastparquet "
+            "(pip install pyarrow); use formato='csv' si no están instalados"
+        )
+
+
+def _registros_a_columnas(registros):
+    """
+    Transpone una lista de registros (dicts) a un dict de columnas.
+    
+    Las claves se recogen en orden de aparición; los registros que no
+    tienen alguna clave aportan None en esa columna (NaN en pandas).
+    """
+    columnas = dict.fromkeys(clave for registro in registros for clave in registro)
+    return {
+        columna: [registro.get(columna) for registro in registros]
+        for columna in columnas
+    }
+
+
+def _columnas_de_registro(registro):
+    """
+    Obtiene un registro como dict de columnas.
+    
+    Acepta tres formas: un objeto con método columnas() (almacenamiento
+    columnar), un dict {columna: lista o array} o la clásica lista de dicts.
+    """
+    if hasattr(registro, 'columnas'):
+        return registro.columnas()
+    if isinstance(registro, dict):
+        return registro
+    return _registros_a_columnas(registro)
+
+
+# Fases de verde vehicular (fijo y adaptativo)
+FASES_VERDE_VEHICULAR = [
+    'VERDE_VEHICULAR',
+    'VERDE_VEHICULAR_INICIAL',
+    'VERDE_VEHICULAR_EXTENSION'
+]
+
+# Tipos declarados por registro; las columnas no listadas se infieren
+_ESQUEMA_SERVICIOS = {
+    'id': np.int64,
+    'tiempo_llegada': np.float64,
+    'tiempo_inicio_servicio': np.float64,
+    'tiempo_fin_servicio': np.float64,
+    'tiempo_espera': np.float64,
+    'tiempo_servicio': np.float64,
+    'ciclo': np.int64
+}
+
+ESQUEMAS_REGISTROS = {
+    'servicios_vehiculos': _ESQUEMA_SERVICIOS,
+    'servicios_peatones': _ESQUEMA_SERVICIOS,
+    'eventos_semaforo': {
+        'tiempo': np.float64,
+        'fase': 'category',
+        'ciclo': np.int64,
+        'cola_v': np.int64,
+        'cola_p': np.int64
+    },
+    'estado_colas': {
+        'tiempo': np.float64,
+        'cola_v': np.int64,
+        'cola_p': np.int64,
+        'fase': 'category'
+    }
+}
+
+_CUANTILES_ESPERA = np.array([0.25, 0.50, 0.75, 0.90, 0.95, 0.99])
+
+
+def _estadisticas_espera(esperas, umbral):
+    """
+    Núcleo estadístico de los tiempos de espera.
+    
+    Un solo ordenamiento alimenta percentiles, extremos y el conteo de
+    esperas por encima del umbral.
+    
+    Retorna:
+    --------
+    tuple
+        (n, media, std, min, max, percentiles, n_excesivos)
+    """
+    esperas = np.sort(esperas)
+    n = len(esperas)
+    percentiles = np.quantile(esperas, _CUANTILES_ESPERA)
+    n_excesivos = n - esperas.searchsorted(umbral, side='right')
+    return (n, esperas.mean(), esperas.std(), esperas[0], esperas[-1],
+            tuple(percentiles), n_excesivos)
+
+
+def _escribir_csv(df, path):
+    """
+    Escribe un DataFrame a CSV con csv.writer sobre sus columnas, sin el
+    formateo por celda de DataFrame.to_csv.
+    
+    El resultado es idéntico al de df.to_csv(path, index=False): UTF-8
+    sea cual sea la codificación del sistema, los floats se escriben con
+    repr y los valores faltantes como campo vacío.
+    """
+    columnas = []
+    for nombre in df.columns:
+        serie = df[nombre]
+        valores = serie.to_numpy()
+        if valores.dtype.kind == 'f':
+            lista = valores.tolist()
+            if np.isnan(valores).any():
+                lista = [None if v != v else v for v in lista]
+        elif serie.isna().any():
+            lista = serie.astype(object).where(serie.notna(), None).tolist()
+        else:
+            lista = serie.tolist()
+        columnas.append(lista)
+    
+    with open(path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+        escritor = csv.writer(f, lineterminator=os.linesep)
+        escritor.writerow(df.columns)
+        escritor.writerows(zip(*columnas))
+
+
 class AnalizadorMetricas:
     """
     Clase para analizar y calcular métricas completas del sistema.
@@ -16,7 +149,9 @@ class AnalizadorMetricas:
         Parámetros:
         -----------
         registros : dict
-            Diccionario con todos los registros de la simulación
+            Diccionario con todos los registros de la simulación. Cada
+            registro puede ser una lista de dicts o estar ya por columnas
+            (dict de listas/arrays u objeto con método columnas()).
         tiempo_sim : float
             Tiempo total de simulación
         tiempo_warmup : float
@@ -26,38 +161,70 @@ class AnalizadorMetricas:
         self.tiempo_sim = tiempo_sim
         self.tiempo_warmup = tiempo_warmup
         self.tiempo_efectivo = tiempo_sim - tiempo_warmup
+        
+        # DataFrames ya construidos, por clave de registro
+        self._dfs = {}
+        self._resumen_cache = None
+    
+    def _crear_df(self, clave):
+        """
+        Construye (una sola vez) un DataFrame por columnas a partir de un registro.
+        
+        Las llamadas siguientes devuelven el mismo objeto, así que no debe
+        modificarse in situ. Con un RegistroColumnar el DataFrame comparte
+        memoria con sus columnas (copy=False): columnas() entrega vistas de
+        las filas ya usadas [:n], y agregar() escribe después de n (o en un
+        arreglo nuevo al crecer), así que nunca altera un DataFrame ya creado.
+        """
+        if clave not in self._dfs:
+            registro = self.registros.get(clave)
+            columnas = _columnas_de_registro(registro) if registro is not None else {}
+            if not columnas or len(next(iter(columnas.values()))) == 0:
+                self._dfs[clave] = pd.DataFrame()
+            else:
+                df = pd.DataFrame(columnas, copy=False)
+                esquema = ESQUEMAS_REGISTROS.get(clave, {})
+                self._dfs[clave] = df.astype(
+                    {col: tipo for col, tipo in esquema.items() if col in df.columns}
+                )
+        
+        return self._dfs[clave]
+    
+    @property
+    def df_servicios_vehiculos(self):
+        """DataFrame de servicios de vehículos (construido al primer acceso)."""
+        return self.crear_df_servicios_vehiculos()
+    
+    @property
+    def df_servicios_peatones(self):
+        """DataFrame de servicios de peatones (construido al primer acceso)."""
+        return self.crear_df_servicios_peatones()
+    
+    @property
+    def df_eventos_semaforo(self):
+        """DataFrame de eventos del semáforo (construido al primer acceso)."""
+        return self.crear_df_eventos_semaforo()
+    
+    @property
+    def df_estado_colas(self):
+        """DataFrame del estado de colas (construido al primer acceso)."""
+        return self.crear_df_estado_colas()
     
     def crear_df_servicios_vehiculos(self):
         """Crea DataFrame con servicios de vehículos."""
-        if not self.registros.get('servicios_vehiculos'):
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(self.registros['servicios_vehiculos'])
-        return df
+        return self._crear_df('servicios_vehiculos')
     
     def crear_df_servicios_peatones(self):
         """Crea DataFrame con servicios de peatones."""
-        if not self.registros.get('servicios_peatones'):
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(self.registros['servicios_peatones'])
-        return df
+        return self._crear_df('servicios_peatones')
     
     def crear_df_eventos_semaforo(self):
         """Crea DataFrame con eventos del semáforo."""
-        if not self.registros.get('eventos_semaforo'):
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(self.registros['eventos_semaforo'])
-        return df
+        return self._crear_df('eventos_semaforo')
     
     def crear_df_estado_colas(self):
         """Crea DataFrame con estado de colas en el tiempo."""
-        if not self.registros.get('estado_colas'):
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(self.registros['estado_colas'])
-        return df
+        return self._crear_df('estado_colas')
     
     def calcular_metricas_espera(self, df_servicios, tipo="vehiculos"):
         """
@@ -66,28 +233,44 @@ class AnalizadorMetricas:
         if df_servicios.empty:
             return None
         
-        esperas = df_servicios['tiempo_espera'].values
+        return self.calcular_metricas_espera_raw(
+            df_servicios['tiempo_espera'].to_numpy(dtype=np.float64), tipo
+        )
+    
+    def calcular_metricas_espera_raw(self, esperas, tipo="vehiculos"):
+        """
+        Calcula métricas de tiempo de espera directamente sobre un array,
+        sin construir un DataFrame.
+        """
+        esperas = np.asarray(esperas, dtype=np.float64)
+        if len(esperas) == 0:
+            return None
         
+        # Proporción con espera excesiva (>60s para vehículos, >90s para peatones)
+        umbral_excesivo = 60 if tipo == "vehiculos" else 90
+        (n, media, std, minimo, maximo,
+         (p25, p50, p75, p90, p95, p99), n_excesivos) = _estadisticas_espera(
+            esperas, umbral_excesivo
+        )
+
         metricas = {
             'tipo': tipo,
-            'n_atendidos': len(esperas),
-            'espera_media': np.mean(esperas),
-            'espera_mediana': np.median(esperas),
-            'espera_std': np.std(esperas),
-            'espera_min': np.min(esperas),
-            'espera_max': np.max(esperas),
-            'percentil_25': np.percentile(esperas, 25),
-            'percentil_50': np.percentile(esperas, 50),
-            'percentil_75': np.percentile(esperas, 75),
-            'percentil_90': np.percentile(esperas, 90),
-            'percentil_95': np.percentile(esperas, 95),
-            'percentil_99': np.percentile(esperas, 99),
-            'coef_variacion': np.std(esperas) / np.mean(esperas) if np.mean(esperas) > 0 else 0
+            'n_atendidos': n,
+            'espera_media': media,
+            'espera_mediana': p50,
+            'espera_std': std,
+            'espera_min': minimo,
+            'espera_max': maximo,
+            'percentil_25': p25,
+            'percentil_50': p50,
+            'percentil_75': p75,
+            'percentil_90': p90,
+            'percentil_95': p95,
+            'percentil_99': p99,
+            'coef_variacion': std / media if media > 0 else 0
         }
-        
-        # Proporción con espera excesiva (>60s para vehículos, >90s para peatones)
-        umbral_excesivo = 60 if tipo == "vehiculos" else 90
-        metricas['prop_espera_excesiva'] = np.sum(esperas > umbral_excesivo) / len(esperas)
+
+        metricas['prop_espera_excesiva'] = n_excesivos / n
         metricas['umbral_excesivo'] = umbral_excesivo
         
         return metricas
@@ -116,13 +299,34 @@ class AnalizadorMetricas:
         if df_servicios.empty or 'ciclo' not in df_servicios.columns:
             return pd.DataFrame()
         
-        metricas_ciclo = df_servicios.groupby('ciclo').agg({
-            'tiempo_espera': ['count', 'mean', 'std', 'max'],
-            'tiempo_servicio': ['mean', 'sum']
-        }).reset_index()
-        
-        metricas_ciclo.columns = ['ciclo', 'n_atendidos', 'espera_media', 'espera_std', 
-                                   'espera_max', 'servicio_medio', 'tiempo_servicio_total']
+        # Reducción segmentada con numpy: los ciclos son enteros pequeños
+        ciclos, idx = np.unique(df_servicios['ciclo'].to_numpy(), return_inverse=True)
+        esperas = df_servicios['tiempo_espera'].to_numpy(dtype=np.float64)
+        servicios = df_servicios['tiempo_servicio'].to_numpy(dtype=np.float64)
+        
+        conteo = np.bincount(idx)
+        espera_media = np.bincount(idx, weights=esperas) / conteo
+        desvios = esperas - espera_media[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # ddof=1 como pandas: NaN en ciclos con un solo elemento
+            espera_std = np.sqrt(np.bincount(idx, weights=desvios * desvios) / (conteo - 1))
+        espera_std[conteo < 2] = np.nan
+        
+        orden = np.argsort(idx, kind='stable')
+        inicios = np.concatenate(([0], np.cumsum(conteo)[:-1]))
+        espera_max = np.maximum.reduceat(esperas[orden], inicios)
+        
+        servicio_total = np.bincount(idx, weights=servicios)
+        
+        metricas_ciclo = pd.DataFrame({
+            'ciclo': ciclos,
+            'n_atendidos': conteo,
+            'espera_media': espera_media,
+            'espera_std': espera_std,
+            'espera_max': espera_max,
+            'servicio_medio': servicio_total / conteo,
+            'tiempo_servicio_total': servicio_total
+        })
         
         return metricas_ciclo
     
@@ -134,11 +338,11 @@ class AnalizadorMetricas:
             return None
         
         # Filtrar eventos de verde
-        verde_v = df_eventos[df_eventos['fase'].str.contains('VERDE_VEHICULAR', na=False)]
-        verde_p = df_eventos[df_eventos['fase'] == 'VERDE_PEATONAL']
+        fase = df_eventos['fase']
+        duracion = df_eventos['duracion'].to_numpy()
         
-        tiempo_verde_v = verde_v['duracion'].sum()
-        tiempo_verde_p = verde_p['duracion'].sum()
+        tiempo_verde_v = duracion[fase.isin(FASES_VERDE_VEHICULAR).to_numpy()].sum()
+        tiempo_verde_p = duracion[(fase == 'VERDE_PEATONAL').to_numpy()].sum()
         tiempo_total_verde = tiempo_verde_v + tiempo_verde_p
         
         return {
@@ -193,184 +397,185 @@ class AnalizadorMetricas:
     def generar_resumen_completo(self):
         """
         Genera resumen completo con todas las métricas.
+        
+        El resumen se calcula una sola vez; las llamadas siguientes
+        devuelven el mismo diccionario.
         """
+        if self._resumen_cache is not None:
+            return self._resumen_cache
+        
         # Crear DataFrames
         df_v = self.crear_df_servicios_vehiculos()
         df_p = self.crear_df_servicios_peatones()
         df_eventos = self.crear_df_eventos_semaforo()
         df_estado = self.crear_df_estado_colas()
         
-        # Calcular métricas
+        # Calcular métricas (las de espera se reutilizan para la equidad)
+        metricas_v = self.calcular_metricas_espera(df_v, "vehiculos")
+        metricas_p = self.calcular_metricas_espera(df_p, "peatones")
+        
         resumen = {
             'configuracion': {
                 'tiempo_simulacion': self.tiempo_sim,
                 'tiempo_warmup': self.tiempo_warmup,
                 'tiempo_efectivo': self.tiempo_efectivo
             },
-            'metricas_espera_vehiculos': self.calcular_metricas_espera(df_v, "vehiculos"),
-            'metricas_espera_peatones': self.calcular_metricas_espera(df_p, "peatones"),
+            'metricas_espera_vehiculos': metricas_v,
+            'metricas_espera_peatones': metricas_p,
             'throughput_vehiculos': self.calcular_throughput(df_v, "vehiculos"),
             'throughput_peatones': self.calcular_throughput(df_p, "peatones"),
             'uso_tiempo_verde': self.calcular_uso_tiempo_verde(df_eventos),
             'longitud_colas': self.calcular_longitud_cola_promedio(df_estado),
-            'equidad': self.calcular_indice_equidad(
-                self.calcular_metricas_espera(df_v, "vehiculos"),
-                self.calcular_metricas_espera(df_p, "peatones")
-            )
+            'equidad': self.calcular_indice_equidad(metricas_v, metricas_p)
         }
         
+        self._resumen_cache = resumen
         return resumen
     
-    def exportar_a_csv(self, directorio_salida):
+    def exportar_a_csv(self, directorio_salida, formato='csv'):
         """
         Exporta todos los DataFrames a archivos CSV.
+        
+        Parámetros:
+        -----------
+        directorio_salida : str
+            Directorio donde se escriben los archivos
+        formato : str
+            'csv' (por defecto) o 'parquet'. Parquet requiere pyarrow o
+            fastparquet instalados (dependencias opcionales, no incluidas);
+            sin ellos se lanza ImportError antes de escribir nada.
         """
-        import os
+        if formato not in ('csv', 'parquet'):
+            raise ValueError(f"Formato no soportado: {formato}")
+        if formato == 'parquet':
+            _verificar_motor_parquet()
         os.makedirs(directorio_salida, exist_ok=True)
         
-        archivos_creados = []
-        
-        # Servicios de vehículos
         df_v = self.crear_df_servicios_vehiculos()
-        if not df_v.empty:
-            path = os.path.join(directorio_salida, 'servicios_vehiculos.csv')
-            df_v.to_csv(path, index=False)
-            archivos_creados.append(path)
-        
-        # Servicios de peatones
         df_p = self.crear_df_servicios_peatones()
-        if not df_p.empty:
-            path = os.path.join(directorio_salida, 'servicios_peatones.csv')
-            df_p.to_csv(path, index=False)
-            archivos_creados.append(path)
         
-        # Eventos del semáforo
-        df_eventos = self.crear_df_eventos_semaforo()
-        if not df_eventos.empty:
-            path = os.path.join(directorio_salida, 'eventos_semaforo.csv')
-            df_eventos.to_csv(path, index=False)
-            archivos_creados.append(path)
+        # Resumen de métricas
+        df_resumen = self._convertir_resumen_a_df(self.generar_resumen_completo())
+        if formato == 'parquet':
+            # 'valor' mezcla números y textos; Parquet exige un tipo por columna
+            df_resumen = df_resumen.astype({'valor': str})
+        
+        tablas = [
+            ('servicios_vehiculos', df_v),
+            ('servicios_peatones', df_p),
+            ('eventos_semaforo', self.crear_df_eventos_semaforo()),
+            ('estado_colas', self.crear_df_estado_colas()),
+            ('metricas_por_ciclo_vehiculos', self.calcular_metricas_por_ciclo(df_v, "vehiculos")),
+            ('metricas_por_ciclo_peatones', self.calcular_metricas_por_ciclo(df_p, "peatones")),
+            ('resumen_metricas', df_resumen)
+        ]
         
-        # Estado de colas
-        df_estado = self.crear_df_estado_colas()
-        if not df_estado.empty:
-            path = os.path.join(directorio_salida, 'estado_colas.csv')
-            df_estado.to_csv(path, index=False)
+        archivos_creados = []
+        for nombre, df in tablas:
+            if df.empty and nombre != 'resumen_metricas':
+                continue
+            path = os.path.join(directorio_salida, f'{nombre}.{formato}')
+            if formato == 'parquet':
+                df.to_parquet(path, index=False)
+            else:
+                _escribir_csv(df, path)
             archivos_creados.append(path)
         
-        # Métricas por ciclo
-        if not df_v.empty:
-            df_ciclos_v = self.calcular_metricas_por_ciclo(df_v, "vehiculos")
-            if not df_ciclos_v.empty:
-                path = os.path.join(directorio_salida, 'metricas_por_ciclo_vehiculos.csv')
-                df_ciclos_v.to_csv(path, index=False)
-                archivos_creados.append(path)
-        
-        if not df_p.empty:
-            df_ciclos_p = self.calcular_metricas_por_ciclo(df_p, "peatones")
-            if not df_ciclos_p.empty:
-                path = os.path.join(directorio_salida, 'metricas_por_ciclo_peatones.csv')
-                df_ciclos_p.to_csv(path, index=False)
-                archivos_creados.append(path)
-        
-        # Resumen de métricas
-        resumen = self.generar_resumen_completo()
-        df_resumen = self._convertir_resumen_a_df(resumen)
-        path = os.path.join(directorio_salida, 'resumen_metricas.csv')
-        df_resumen.to_csv(path, index=False)
-        archivos_creados.append(path)
-        
         return archivos_creados
     
     def _convertir_resumen_a_df(self, resumen):
         """Convierte el resumen a un DataFrame plano."""
-        filas = []
+        secciones, metricas, valores = [], [], []
         
         for seccion, datos in resumen.items():
-            if datos is None:
-                continue
             if isinstance(datos, dict):
                 for clave, valor in datos.items():
-                    filas.append({
-                        'seccion': seccion,
-                        'metrica': clave,
-                        'valor': valor
-                    })
-        
-        return pd.DataFrame(filas)
+                    secciones.append(seccion)
+                    metricas.append(clave)
+                    valores.append(valor)
+        
+        return pd.DataFrame({
+            'seccion': secciones,
+            'metrica': metricas,
+            'valor': valores
+        }, copy=False)
 
 
 def imprimir_resumen_metricas(resumen):
     """
     Imprime el resumen de métricas de forma legible.
     """
-    print("\n" + "="*70)
-    print("RESUMEN COMPLETO DE MÉTRICAS")
-    print("="*70)
+    lineas = []
+    lineas.append("\n" + "="*70)
+    lineas.append("RESUMEN COMPLETO DE MÉTRICAS")
+    lineas.append("="*70)
     
     # Configuración
     if resumen.get('configuracion'):
         cfg = resumen['configuracion']
-        print(f"\n⚙️  CONFIGURACIÓN:")
-        print(f"   Tiempo total simulación:  {cfg['tiempo_simulacion']:.0f} seg")
-        print(f"   Tiempo warm-up:           {cfg['tiempo_warmup']:.0f} seg")
-        print(f"   Tiempo efectivo:          {cfg['tiempo_efectivo']:.0f} seg")
+        lineas.append(f"\n⚙️  CONFIGURACIÓN:")
+        lineas.append(f"   Tiempo total simulación:  {cfg['tiempo_simulacion']:.0f} seg")
+        lineas.append(f"   Tiempo warm-up:           {cfg['tiempo_warmup']:.0f} seg")
+        lineas.append(f"   Tiempo efectivo:          {cfg['tiempo_efectivo']:.0f} seg")
     
     # Vehículos
     if resumen.get('metricas_espera_vehiculos'):
         v = resumen['metricas_espera_vehiculos']
-        print(f"\n🚗 VEHÍCULOS:")
-        print(f"   Atendidos:                {v['n_atendidos']}")
-        print(f"   Espera media:             {v['espera_media']:.2f} seg (σ={v['espera_std']:.2f})")
-        print(f"   Espera mediana:           {v['espera_mediana']:.2f} seg")
-        print(f"   Rango:                    [{v['espera_min']:.2f}, {v['espera_max']:.2f}] seg")
-        print(f"   Percentil 95:             {v['percentil_95']:.2f} seg")
-        print(f"   Espera excesiva (>{v['umbral_excesivo']}s): {v['prop_espera_excesiva']*100:.1f}%")
+        lineas.append(f"\n🚗 VEHÍCULOS:")
+        lineas.append(f"   Atendidos:                {v['n_atendidos']}")
+        lineas.append(f"   Espera media:             {v['espera_media']:.2f} seg (σ={v['espera_std']:.2f})")
+        lineas.append(f"   Espera mediana:           {v['espera_mediana']:.2f} seg")
+        lineas.append(f"   Rango:                    [{v['espera_min']:.2f}, {v['espera_max']:.2f}] seg")
+        lineas.append(f"   Percentil 95:             {v['percentil_95']:.2f} seg")
+        lineas.append(f"   Espera excesiva (>{v['umbral_excesivo']}s): {v['prop_espera_excesiva']*100:.1f}%")
     
     # Peatones
     if resumen.get('metricas_espera_peatones'):
         p = resumen['metricas_espera_peatones']
-        print(f"\n🚶 PEATONES:")
-        print(f"   Atendidos:                {p['n_atendidos']}")
-        print(f"   Espera media:             {p['espera_media']:.2f} seg (σ={p['espera_std']:.2f})")
-        print(f"   Espera mediana:           {p['espera_mediana']:.2f} seg")
-        print(f"   Rango:                    [{p['espera_min']:.2f}, {p['espera_max']:.2f}] seg")
-        print(f"   Percentil 95:             {p['percentil_95']:.2f} seg")
-        print(f"   Espera excesiva (>{p['umbral_excesivo']}s): {p['prop_espera_excesiva']*100:.1f}%")
+        lineas.append(f"\n🚶 PEATONES:")
+        lineas.append(f"   Atendidos:                {p['n_atendidos']}")
+        lineas.append(f"   Espera media:             {p['espera_media']:.2f} seg (σ={p['espera_std']:.2f})")
+        lineas.append(f"   Espera mediana:           {p['espera_mediana']:.2f} seg")
+        lineas.append(f"   Rango:                    [{p['espera_min']:.2f}, {p['espera_max']:.2f}] seg")
+        lineas.append(f"   Percentil 95:             {p['percentil_95']:.2f} seg")
+        lineas.append(f"   Espera excesiva (>{p['umbral_excesivo']}s): {p['prop_espera_excesiva']*100:.1f}%")
     
     # Throughput
     if resumen.get('throughput_vehiculos'):
         tv = resumen['throughput_vehiculos']
-        print(f"\n📊 THROUGHPUT VEHICULAR:")
-        print(f"   {tv['throughput_hora']:.1f} veh/hora")
+        lineas.append(f"\n📊 THROUGHPUT VEHICULAR:")
+        lineas.append(f"   {tv['throughput_hora']:.1f} veh/hora")
     
     if resumen.get('throughput_peatones'):
         tp = resumen['throughput_peatones']
-        print(f"\n📊 THROUGHPUT PEATONAL:")
-        print(f"   {tp['throughput_hora']:.1f} peat/hora")
+        lineas.append(f"\n📊 THROUGHPUT PEATONAL:")
+        lineas.append(f"   {tp['throughput_hora']:.1f} peat/hora")
     
     # Uso de tiempo verde
     if resumen.get('uso_tiempo_verde'):
         u = resumen['uso_tiempo_verde']
-        print(f"\n🚦 USO DE TIEMPO VERDE:")
-        print(f"   Ciclos totales:           {u['ciclos_totales']}")
-        print(f"   Tiempo verde vehicular:   {u['tiempo_verde_vehicular']:.0f} seg ({u['proporcion_verde_v']*100:.1f}%)")
-        print(f"   Tiempo verde peatonal:    {u['tiempo_verde_peatonal']:.0f} seg ({u['proporcion_verde_p']*100:.1f}%)")
+        lineas.append(f"\n🚦 USO DE TIEMPO VERDE:")
+        lineas.append(f"   Ciclos totales:           {u['ciclos_totales']}")
+        lineas.append(f"   Tiempo verde vehicular:   {u['tiempo_verde_vehicular']:.0f} seg ({u['proporcion_verde_v']*100:.1f}%)")
+        lineas.append(f"   Tiempo verde peatonal:    {u['tiempo_verde_peatonal']:.0f} seg ({u['proporcion_verde_p']*100:.1f}%)")
     
     # Longitud de colas
     if resumen.get('longitud_colas'):
         lc = resumen['longitud_colas']
-        print(f"\n📈 LONGITUD DE COLAS:")
-        print(f"   Cola vehicular media:     {lc['cola_v_media']:.2f} veh (máx: {lc['cola_v_max']})")
-        print(f"   Cola peatonal media:      {lc['cola_p_media']:.2f} peat (máx: {lc['cola_p_max']})")
+        lineas.append(f"\n📈 LONGITUD DE COLAS:")
+        lineas.append(f"   Cola vehicular media:     {lc['cola_v_media']:.2f} veh (máx: {lc['cola_v_max']})")
+        lineas.append(f"   Cola peatonal media:      {lc['cola_p_media']:.2f} peat (máx: {lc['cola_p_max']})")
     
     # Equidad
     if resumen.get('equidad'):
         eq = resumen['equidad']
-        print(f"\n⚖️  ÍNDICE DE EQUIDAD:")
-        print(f"   Espera normalizada veh:   {eq['espera_normalizada_v']:.3f}")
-        print(f"   Espera normalizada peat:  {eq['espera_normalizada_p']:.3f}")
-        print(f"   Ratio de equidad:         {eq['ratio_equidad']:.3f}")
-        print(f"   Sesgo hacia:              {eq['sesgo']}")
+        lineas.append(f"\n⚖️  ÍNDICE DE EQUIDAD:")
+        lineas.append(f"   Espera normalizada veh:   {eq['espera_normalizada_v']:.3f}")
+        lineas.append(f"   Espera normalizada peat:  {eq['espera_normalizada_p']:.3f}")
+        lineas.append(f"   Ratio de equidad:         {eq['ratio_equidad']:.3f}")
+        lineas.append(f"   Sesgo hacia:              {eq['sesgo']}")
+    
+    lineas.append("="*70 + "\n")
     
-    print("="*70 + "\n")
\ No newline at end of file
+    # Reporte armado completo y escrito de una sola vez
+    print("\n".join(lineas))
@@ -5,21 +5,355 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import pandas as pd
-from matplotlib.patches import Rectangle
+from matplotlib.collections import PolyCollection
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+from .metricas import FASES_VERDE_VEHICULAR
 
 # Configurar estilo
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 plt.rcParams['font.size'] = 10
 
+# Resolución de guardado y compresión PNG rápida (zlib nivel 1)
+SAVEFIG_DPI = 150
+PNG_PIL_KWARGS = {'compress_level': 1}
+
+# Opciones de Pillow por formato de imagen (WebP: vista previa ligera)
+PIL_KWARGS_FORMATO = {
+    'png': PNG_PIL_KWARGS,
+    'webp': {'quality': 85, 'method': 4}
+}
+
+# Puntos máximos por serie temporal (más que píxeles útiles de ancho)
+MAX_PUNTOS_SERIE = 4000
+
+
+def _histograma(ax, valores, bins=30, **kwargs):
+    """
+    Dibuja un histograma de bins uniformes entre el mínimo y el máximo.
+    
+    Equivale a ax.hist(valores, bins=bins) pero cuenta con np.bincount
+    sobre el índice de bin calculado aritméticamente, sin búsqueda de bordes.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    minimo, maximo = valores.min(), valores.max()
+    if minimo == maximo:
+        minimo, maximo = minimo - 0.5, maximo + 0.5
+    
+    bordes = np.linspace(minimo, maximo, bins + 1)
+    indices = ((valores - minimo) * (bins / (maximo - minimo))).astype(np.intp)
+    np.clip(indices, 0, bins - 1, out=indices)
+    conteos = np.bincount(indices, minlength=bins)
+    
+    return ax.bar(bordes[:-1], conteos, width=np.diff(bordes), align='edge', **kwargs)
+
+
+def _atendidos_por_ciclo(df_servicios):
+    """Retorna (ciclos, atendidos) contando servicios por ciclo."""
+    if df_servicios.empty or 'ciclo' not in df_servicios.columns:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    return np.unique(df_servicios['ciclo'].to_numpy(), return_counts=True)
+
+
+def _guardar_figura(fig, path, formato):
+    """Guarda la figura en path con las opciones de Pillow del formato."""
+    fig.savefig(path, dpi=SAVEFIG_DPI, bbox_inches='tight',
+                pil_kwargs=PIL_KWARGS_FORMATO[formato])
+    print(f"✅ Gráfico guardado: {path}")
+
+
+# Funciones de dibujo: reciben solo los arrays de su gráfico (no el
+# visualizador), así que enviarlas a otro proceso es barato.
+
+def _dibujar_series_temporales_colas(tiempos, cola_v, cola_p, sombreados):
+    """
+    Series temporales de longitud de colas con cambios de fase.
+    sombreados es una lista de (inicios, fines, color) de las fases a marcar.
+    """
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
+    
+    # Serie temporal de cola vehicular
+    ax1.plot(tiempos, cola_v, 
+             color='#2E86AB', linewidth=1.5, label='Cola vehicular')
+    ax1.fill_between(tiempos, cola_v, 
+                     alpha=0.3, color='#2E86AB')
+    ax1.set_ylabel('Vehículos en cola', fontsize=12, fontweight='bold')
+    ax1.set_title('Evolución de Colas en el Tiempo', fontsize=14, fontweight='bold')
+    ax1.legend(loc='upper right')
+    ax1.grid(True, alpha=0.3)
+    
+    # Serie temporal de cola peatonal
+    ax2.plot(tiempos, cola_p, 
+             color='#A23B72', linewidth=1.5, label='Cola peatonal')
+    ax2.fill_between(tiempos, cola_p, 
+                     alpha=0.3, color='#A23B72')
+    ax2.set_xlabel('Tiempo (segundos)', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Peatones en cola', fontsize=12, fontweight='bold')
+    ax2.legend(loc='upper right')
+    ax2.grid(True, alpha=0.3)
+    
+    # Marcar cambios de fase (fondo de color): una colección por color y eje
+    for x0, x1, color in sombreados:
+        # x en datos, y en coordenadas del eje (0-1), igual que axvspan
+        vertices = np.stack([
+            np.column_stack([x0, np.zeros_like(x0)]),
+            np.column_stack([x0, np.ones_like(x0)]),
+            np.column_stack([x1, np.ones_like(x1)]),
+            np.column_stack([x1, np.zeros_like(x1)])
+        ], axis=1)
+        for ax in [ax1, ax2]:
+            ax.add_collection(PolyCollection(
+                vertices, facecolors=color, edgecolors=color, alpha=0.1,
+                transform=ax.get_xaxis_transform()
+            ), autolim=False)
+            ax.update_datalim([(x0.min(), 0), (x1.max(), 0)], updatey=False)
+    if sombreados:
+        ax1.autoscale_view(scaley=False)
+    
+    return fig
+
+
+def _dibujar_histogramas_espera(esperas_v, esperas_p):
+    """
+    Histogramas de distribución de tiempos de espera.
+    esperas_v y esperas_p son los resultados de _preparar_esperas (o None).
+    """
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    
+    # Histograma vehículos
+    if esperas_v is not None:
+        ax1 = axes[0]
+        
+        _histograma(ax1, esperas_v['ordenadas'], bins=30, color='#2E86AB', alpha=0.7, edgecolor='black')
+        ax1.axvline(esperas_v['media'], color='red', linestyle='--', 
+                   linewidth=2, label=f'Media: {esperas_v["media"]:.1f}s')
+        ax1.axvline(esperas_v['p95'], color='orange', linestyle='--',
+                   linewidth=2, label=f'P95: {esperas_v["p95"]:.1f}s')
+        
+        ax1.set_xlabel('Tiempo de espera (segundos)', fontsize=11, fontweight='bold')
+        ax1.set_ylabel('Frecuencia', fontsize=11, fontweight='bold')
+        ax1.set_title('Distribución de Espera - Vehículos', fontsize=12, fontweight='bold')
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+    
+    # Histograma peatones
+    if esperas_p is not None:
+        ax2 = axes[1]
+        
+        _histograma(ax2, esperas_p['ordenadas'], bins=30, color='#A23B72', alpha=0.7, edgecolor='black')
+        ax2.axvline(esperas_p['media'], color='red', linestyle='--',
+                   linewidth=2, label=f'Media: {esperas_p["media"]:.1f}s')
+        ax2.axvline(esperas_p['p95'], color='orange', linestyle='--',
+                   linewidth=2, label=f'P95: {esperas_p["p95"]:.1f}s')
+        
+        ax2.set_xlabel('Tiempo de espera (segundos)', fontsize=11, fontweight='bold')
+        ax2.set_ylabel('Frecuencia', fontsize=11, fontweight='bold')
+        ax2.set_title('Distribución de Espera - Peatones', fontsize=12, fontweight='bold')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+    
+    #.
+    
+    return fig
+
+
+def _dibujar_cdf_espera(esperas_v, esperas_p):
+    """
+    Funciones de distribución acumulada (CDF) de tiempos de espera.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    # CDF vehículos
+    if esperas_v is not None:
+        ordenadas_v = esperas_v['ordenadas']
+        cdf_v = np.linspace(1.0 / len(ordenadas_v), 1.0, len(ordenadas_v))
+        ax.plot(ordenadas_v, cdf_v, linewidth=2.5, label='Vehículos', color='#2E86AB')
+    
+    # CDF peatones
+    if esperas_p is not None:
+        ordenadas_p = esperas_p['ordenadas']
+        cdf_p = np.linspace(1.0 / len(ordenadas_p), 1.0, len(ordenadas_p))
+        ax.plot(ordenadas_p, cdf_p, linewidth=2.5, label='Peatones', color='#A23B72')
+    
+    # Líneas de referencia
+    ax.axhline(0.5, color='gray', linestyle=':', alpha=0.6, label='Mediana (50%)')
+    ax.axhline(0.95, color='orange', linestyle=':', alpha=0.6, label='Percentil 95')
+    
+    ax.set_xlabel('Tiempo de espera (segundos)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Probabilidad acumulada', fontsize=12, fontweight='bold')
+    ax.set_title('Función de Distribución Acumulada (CDF) - Tiempos de Espera', 
+                fontsize=13, fontweight='bold')
+    ax.legend(loc='lower right', fontsize=11)
+    ax.grid(True, alpha=0.3)
+    ax.set_ylim([0, 1])
+    
+    #.
+    
+    return fig
+
+
+def _dibujar_gantt_ciclos(tiempos, duraciones, y_pos, fases, n_ciclos):
+    """
+    Diagrama de Gantt de las fases del semáforo por ciclo.
+    """
+    fig, ax = plt.subplots(figsize=(14, min(12, max(6, n_ciclos * 0.5))))
+    
+    # Colores por fase
+    colores = {
+        'VERDE_VEHICULAR': '#4CAF50',
+        'VERDE_VEHICULAR_INICIAL': '#4CAF50',
+        'VERDE_VEHICULAR_EXTENSION': '#66BB6A',
+        'AMARILLO_VEHICULAR': '#FFC107',
+        'VERDE_PEATONAL': '#E91E63',
+        'AMARILLO_PEATONAL': '#FF9800'
+    }
+    
+    # Todos los rectángulos en una sola colección (vértices en bloque)
+    x0, x1 = tiempos, tiempos + duraciones
+    y0, y1 = y_pos - 0.4, y_pos + 0.4
+    vertices = np.stack([
+        np.column_stack([x0, y0]),
+        np.column_stack([x0, y1]),
+        np.column_stack([x1, y1]),
+        np.column_stack([x1, y0])
+    ], axis=1)
+    ax.add_collection(PolyCollection(
+        vertices,
+        facecolors=[colores.get(fase, '#CCCCCC') for fase in fases],
+        edgecolors='black', linewidths=0.5
+    ))
+    ax.autoscale_view()
+    
+    # Etiquetas (solo si la fase es suficientemente larga)
+    largas = duraciones > 5
+    for t, d, y, fase in zip(tiempos[largas], duraciones[largas],
+                             y_pos[largas], fases[largas]):
+        fase_corta = fase.replace('VERDE_', 'V_').replace('AMARILLO_', 'A_')
+        ax.text(t + d/2, y, f"{fase_corta}\n{d:.0f}s",
+               ha='center', va='center', fontsize=7, fontweight='bold')
+    
+    ax.set_xlabel('Tiempo (segundos)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Ciclo del semáforo', fontsize=12, fontweight='bold')
+    ax.set_title(f'Diagrama de Gantt - Primeros {n_ciclos} Ciclos', 
+                fontsize=13, fontweight='bold')
+    ax.set_yticks(range(n_ciclos))
+    ax.set_yticklabels([f'Ciclo {i+1}' for i in range(n_ciclos)])
+    ax.grid(True, axis='x', alpha=0.3)
+    
+    # Leyenda
+    from matplotlib.patches import Patch
+    legend_elements = [
+        Patch(facecolor='#4CAF50', label='Verde Vehicular'),
+        Patch(facecolor='#FFC107', label='Amarillo Vehicular'),
+        Patch(facecolor='#E91E63', label='Verde Peatonal'),
+        Patch(facecolor='#FF9800', label='Amarillo Peatonal')
+    ]
+    ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
+    
+    #.
+    
+    return fig
+
+
+def _dibujar_boxplot_espera(esperas_v, esperas_p):
+    """
+    Boxplots comparativos de tiempos de espera.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    datos = []
+    etiquetas = []
+    
+    if esperas_v is not None:
+        datos.append(esperas_v['ordenadas'])
+        etiquetas.append('Vehículos')
+    
+    if esperas_p is not None:
+        datos.append(esperas_p['ordenadas'])
+        etiquetas.append('Peatones')
+    
+    if datos:
+        bp = ax.boxplot(datos, labels=etiquetas, patch_artist=True,
+                       showmeans=True, meanline=True)
+        
+        # Colores
+        colores = ['#2E86AB', '#A23B72']
+        for patch, color in zip(bp['boxes'], colores):
+            patch.set_facecolor(color)
+            patch.set_alpha(0.6)
+        
+        ax.set_ylabel('Tiempo de espera (segundos)', fontsize=12, fontweight='bold')
+        ax.set_title('Comparación de Tiempos de Espera', fontsize=13, fontweight='bold')
+        ax.grid(True, axis='y', alpha=0.3)
+    
+    #.
+    
+    return fig
+
+
+def _dibujar_metricas_por_ciclo(ciclos_v, atendidos_v, ciclos_p, atendidos_p):
+    """
+    Vehículos y peatones atendidos por ciclo.
+    """
+    fig, axes = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
+    
+    # Vehículos atendidos por ciclo
+    if len(ciclos_v):
+        ax1 = axes[0]
+        ax1.bar(ciclos_v, atendidos_v, 
+               color='#2E86AB', alpha=0.7, label='Vehículos')
+        ax1.set_ylabel('Vehículos atendidos', fontsize=11, fontweight='bold')
+        ax1.set_title('Vehículos y Peatones Atendidos por Ciclo', 
+                     fontsize=13, fontweight='bold')
+        ax1.legend()
+        ax1.grid(True, axis='y', alpha=0.3)
+    
+    # Peatones atendidos por ciclo
+    if len(ciclos_p):
+        ax2 = axes[1]
+        ax2.bar(ciclos_p, atendidos_p, 
+               color='#A23B72', alpha=0.7, label='Peatones')
+        ax2.set_xlabel('Ciclo', fontsize=11, fontweight='bold')
+        ax2.set_ylabel('Peatones atendidos', fontsize=11, fontweight='bold')
+        ax2.legend()
+        ax2.grid(True, axis='y', alpha=0.3)
+    
+    #.
+    
+    return fig
+
+
+# Nombre del gráfico (y de su archivo) -> función de dibujo
+_DIBUJOS = {
+    'series_temporales_colas': _dibujar_series_temporales_colas,
+    'histogramas_espera': _dibujar_histogramas_espera,
+    'cdf_espera': _dibujar_cdf_espera,
+    'gantt_ciclos': _dibujar_gantt_ciclos,
+    'boxplot_espera': _dibujar_boxplot_espera,
+    'metricas_por_ciclo': _dibujar_metricas_por_ciclo
+}
+
+
+def _renderizar_grafico(nombre, datos, path, formato):
+    """
+    Dibuja un gráfico de _DIBUJOS con sus datos, lo guarda en path y
+    cierra la figura. Es una función de módulo para poder enviarse a un
+    ProcessPoolExecutor.
+    """
+    fig = _DIBUJOS[nombre](*datos)
+    _guardar_figura(fig, path, formato)
+    plt.close(fig)
+
 
 class VisualizadorSimulacion:
     """
     Clase para crear visualizaciones del sistema de simulación.
     """
     
-    def __init__(self, analizador, directorio_salida):
+    def __init__(self, analizador, directorio_salida, formato='png'):
         """
         Parámetros:
         -----------
@@ -27,375 +361,248 @@ class VisualizadorSimulacion:
             Analizador con los datos de la simulación
         directorio_salida : str
             Directorio donde guardar los gráficos
+        formato : str
+            Formato de imagen: 'png' (por defecto) o 'webp'
         """
+        if formato not in PIL_KWARGS_FORMATO:
+            raise ValueError(f"Formato no soportado: {formato}")
         self.analizador = analizador
         self.directorio_salida = directorio_salida
+        self.formato = formato
         os.makedirs(directorio_salida, exist_ok=True)
+    
+    # Los DataFrames y arrays derivados se obtienen bajo demanda: un gráfico
+    # aislado solo construye lo que usa.
+    @property
+    def df_v(self):
+        return self.analizador.df_servicios_vehiculos
+    
+    @property
+    def df_p(self):
+        return self.analizador.df_servicios_peatones
+    
+    @property
+    def df_eventos(self):
+        return self.analizador.df_eventos_semaforo
+    
+    @property
+    def df_estado(self):
+        return self.analizador.df_estado_colas
+    
+    @cached_property
+    def esperas_v(self):
+        """Esperas ordenadas, media y P95 (compartidas por histogramas, CDF y boxplot)."""
+        return self._preparar_esperas(self.df_v)
+    
+    @cached_property
+    def esperas_p(self):
+        """Esperas ordenadas, media y P95 (compartidas por histogramas, CDF y boxplot)."""
+        return self._preparar_esperas(self.df_p)
+    
+    @cached_property
+    def tiempos_estado(self):
+        return self.df_estado['tiempo'].to_numpy()
+    
+    @cached_property
+    def cola_v_estado(self):
+        return self.df_estado['cola_v'].to_numpy()
+    
+    @cached_property
+    def cola_p_estado(self):
+        return self.df_estado['cola_p'].to_numpy()
+    
+    def _guardar(self, fig, nombre):
+        """Guarda la figura en el directorio de salida con el formato elegido."""
+        path = os.path.join(self.directorio_salida, f'{nombre}.{self.formato}')
+        _guardar_figura(fig, path, self.formato)
+    
+    @staticmethod
+    def _preparar_esperas(df_servicios):
+        """Ordena una sola vez los tiempos de espera y precalcula media y P95."""
+        if df_servicios.empty:
+            return None
         
-        # Obtener DataFrames
-        self.df_v = analizador.crear_df_servicios_vehiculos()
-        self.df_p = analizador.crear_df_servicios_peatones()
-        self.df_eventos = analizador.crear_df_eventos_semaforo()
-        self.df_estado = analizador.crear_df_estado_colas()
+        ordenadas = np.sort(df_servicios['tiempo_espera'].to_numpy(dtype=np.float64))
+        return {
+            'ordenadas': ordenadas,
+            'media': ordenadas.mean(),
+            'p95': np.percentile(ordenadas, 95)
+        }
     
-    def graficar_series_temporales_colas(self, guardar=True):
-        """
-        Gráfico de series temporales de longitud de colas con cambios de fase.
-        """
+    # Los métodos _datos_* extraen los argumentos de la función de dibujo
+    # del gráfico (None, con un aviso, si no hay datos para graficar).
+    
+    def _datos_series_temporales_colas(self):
         if self.df_estado.empty:
             print("⚠️  No hay datos de estado de colas")
             return None
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
-        
-        # Serie temporal de cola vehicular
-        ax1.plot(self.df_estado['tiempo'], self.df_estado['cola_v'], 
-                 color='#2E86AB', linewidth=1.5, label='Cola vehicular')
-        ax1.fill_between(self.df_estado['tiempo'], self.df_estado['cola_v'], 
-                         alpha=0.3, color='#2E86AB')
-        ax1.set_ylabel('Vehículos en cola', fontsize=12, fontweight='bold')
-        ax1.set_title('Evolución de Colas en el Tiempo', fontsize=14, fontweight='bold')
-        ax1.legend(loc='upper right')
-        ax1.grid(True, alpha=0.3)
+        # Series muy largas se submuestrean con paso uniforme
+        paso = max(1, len(self.tiempos_estado) // MAX_PUNTOS_SERIE)
+        tiempos = self.tiempos_estado[::paso]
+        cola_v = self.cola_v_estado[::paso]
+        cola_p = self.cola_p_estado[::paso]
         
-        # Serie temporal de cola peatonal
-        ax2.plot(self.df_estado['tiempo'], self.df_estado['cola_p'], 
-                 color='#A23B72', linewidth=1.5, label='Cola peatonal')
-        ax2.fill_between(self.df_estado['tiempo'], self.df_estado['cola_p'], 
-                         alpha=0.3, color='#A23B72')
-        ax2.set_xlabel('Tiempo (segundos)', fontsize=12, fontweight='bold')
-        ax2.set_ylabel('Peatones en cola', fontsize=12, fontweight='bold')
-        ax2.legend(loc='upper right')
-        ax2.grid(True, alpha=0.3)
-        
-        # Marcar cambios de fase (fondo de color)
+        # Intervalos de las fases a sombrear, por color
+        sombreados = []
         if not self.df_eventos.empty:
-            for _, evento in self.df_eventos.iterrows():
-                color = None
-                alpha = 0.1
-                
-                if 'VERDE_VEHICULAR' in evento['fase']:
-                    color = '#90EE90'  # Verde claro
-                elif evento['fase'] == 'VERDE_PEATONAL':
-                    color = '#FFB6C1'  # Rosa claro
-                
-                if color:
-                    for ax in [ax1, ax2]:
-                        ax.axvspan(evento['tiempo'], 
-                                  evento['tiempo'] + evento['duracion'],
-                                  color=color, alpha=alpha)  
-        if guardar:
-            path = os.path.join(self.directorio_salida, 'series_temporales_colas.png')
-            plt.savefig(path, dpi=300, bbox_inches='tight')
-            print(f"✅ Gráfico guardado: {path}")
-        
-        return fig
-    
-    def graficar_histogramas_espera(self, guardar=True):
-        """
-        Histogramas de distribución de tiempos de espera.
-        """
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-        
-        # Histograma vehículos
-        if not self.df_v.empty:
-            ax1 = axes[0]
-            esperas_v = self.df_v['tiempo_espera'].values
-            
-            ax1.hist(esperas_v, bins=30, color='#2E86AB', alpha=0.7, edgecolor='black')
-            ax1.axvline(np.mean(esperas_v), color='red', linestyle='--', 
-                       linewidth=2, label=f'Media: {np.mean(esperas_v):.1f}s')
-            ax1.axvline(np.percentile(esperas_v, 95), color='orange', linestyle='--',
-                       linewidth=2, label=f'P95: {np.percentile(esperas_v, 95):.1f}s')
-            
-            ax1.set_xlabel('Tiempo de espera (segundos)', fontsize=11, fontweight='bold')
-            ax1.set_ylabel('Frecuencia', fontsize=11, fontweight='bold')
-            ax1.set_title('Distribución de Espera - Vehículos', fontsize=12, fontweight='bold')
-            ax1.legend()
-            ax1.grid(True, alpha=0.3)
-        
-        # Histograma peatones
-        if not self.df_p.empty:
-            ax2 = axes[1]
-            esperas_p = self.df_p['tiempo_espera'].values
-            
-            ax2.hist(esperas_p, bins=30, color='#A23B72', alpha=0.7, edgecolor='black')
-            ax2.axvline(np.mean(esperas_p), color='red', linestyle='--',
-                       linewidth=2, label=f'Media: {np.mean(esperas_p):.1f}s')
-            ax2.axvline(np.percentile(esperas_p, 95), color='orange', linestyle='--',
-                       linewidth=2, label=f'P95: {np.percentile(esperas_p, 95):.1f}s')
+            fases = self.df_eventos['fase']
+            inicios = self.df_eventos['tiempo'].to_numpy(dtype=np.float64)
+            fines = inicios + self.df_eventos['duracion'].to_numpy(dtype=np.float64)
             
-            ax2.set_xlabel('Tiempo de espera (segundos)', fontsize=11, fontweight='bold')
-            ax2.set_ylabel('Frecuencia', fontsize=11, fontweight='bold')
-            ax2.set_title('Distribución de Espera - Peatones', fontsize=12, fontweight='bold')
-            ax2.legend()
-            ax2.grid(True, alpha=0.3)
-        
-        #.
-        
-        if guardar:
-            path = os.path.join(self.directorio_salida, 'histogramas_espera.png')
-            plt.savefig(path, dpi=300, bbox_inches='tight')
-            print(f"✅ Gráfico guardado: {path}")
-        
-        return fig
+            for mascara, color in [
+                (fases.isin(FASES_VERDE_VEHICULAR).to_numpy(), '#90EE90'),  # Verde claro
+                ((fases == 'VERDE_PEATONAL').to_numpy(), '#FFB6C1')  # Rosa claro
+            ]:
+                if mascara.any():
+                    sombreados.append((inicios[mascara], fines[mascara], color))
+        
+        return tiempos, cola_v, cola_p, sombreados
     
-    def graficar_cdf_espera(self, guardar=True):
-        """
-        Funciones de distribución acumulada (CDF) de tiempos de espera.
-        """
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # CDF vehículos
-        if not self.df_v.empty:
-            esperas_v = np.sort(self.df_v['tiempo_espera'].values)
-            cdf_v = np.arange(1, len(esperas_v) + 1) / len(esperas_v)
-            ax.plot(esperas_v, cdf_v, linewidth=2.5, label='Vehículos', color='#2E86AB')
-        
-        # CDF peatones
-        if not self.df_p.empty:
-            esperas_p = np.sort(self.df_p['tiempo_espera'].values)
-            cdf_p = np.arange(1, len(esperas_p) + 1) / len(esperas_p)
-            ax.plot(esperas_p, cdf_p, linewidth=2.5, label='Peatones', color='#A23B72')
-        
-        # Líneas de referencia
-        ax.axhline(0.5, color='gray', linestyle=':', alpha=0.6, label='Mediana (50%)')
-        ax.axhline(0.95, color='orange', linestyle=':', alpha=0.6, label='Percentil 95')
-        
-        ax.set_xlabel('Tiempo de espera (segundos)', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Probabilidad acumulada', fontsize=12, fontweight='bold')
-        ax.set_title('Función de Distribución Acumulada (CDF) - Tiempos de Espera', 
-                    fontsize=13, fontweight='bold')
-        ax.legend(loc='lower right', fontsize=11)
-        ax.grid(True, alpha=0.3)
-        ax.set_ylim([0, 1])
-        
-        #.
-        
-        if guardar:
-            path = os.path.join(self.directorio_salida, 'cdf_espera.png')
-            plt.savefig(path, dpi=300, bbox_inches='tight')
-            print(f"✅ Gráfico guardado: {path}")
-        
-        return fig
+    def _datos_histogramas_espera(self):
+        return self.esperas_v, self.esperas_p
     
-    def graficar_gantt_ciclos(self, n_ciclos=10, guardar=True):
-        """
-        Diagrama de Gantt mostrando fases del semáforo por ciclo.
-        """
+    _datos_cdf_espera = _datos_histogramas_espera
+    _datos_boxplot_espera = _datos_histogramas_espera
+    
+    def _datos_gantt_ciclos(self, n_ciclos=10):
         if self.df_eventos.empty:
             print("⚠️  No hay datos de eventos del semáforo")
             return None
         
         # Tomar solo los primeros n_ciclos
-        df_eventos_subset = self.df_eventos[self.df_eventos['ciclo'] <= n_ciclos].copy()
+        df_eventos_subset = self.df_eventos[self.df_eventos['ciclo'] <= n_ciclos]
         
         if df_eventos_subset.empty:
             print("⚠️  No hay suficientes ciclos para graficar")
             return None
         
-        fig, ax = plt.subplots(figsize=(14, min(12, max(6, n_ciclos * 0.5))))
-        
-        # Colores por fase
-        colores = {
-            'VERDE_VEHICULAR': '#4CAF50',
-            'VERDE_VEHICULAR_INICIAL': '#4CAF50',
-            'VERDE_VEHICULAR_EXTENSION': '#66BB6A',
-            'AMARILLO_VEHICULAR': '#FFC107',
-            'VERDE_PEATONAL': '#E91E63',
-            'AMARILLO_PEATONAL': '#FF9800'
-        }
-        
-        y_pos = 0
-        ciclo_anterior = None
+        tiempos = df_eventos_subset['tiempo'].to_numpy(dtype=np.float64)
+        duraciones = df_eventos_subset['duracion'].to_numpy(dtype=np.float64)
+        y_pos = df_eventos_subset['ciclo'].to_numpy(dtype=np.float64) - 1
+        fases = df_eventos_subset['fase'].astype(str).to_numpy()
         
-        for _, evento in df_eventos_subset.iterrows():
-            ciclo = evento['ciclo']
-            
-            # Nueva fila para cada ciclo
-            if ciclo != ciclo_anterior:
-                y_pos = ciclo - 1
-                ciclo_anterior = ciclo
-            
-            # Determinar color
-            fase = evento['fase']
-            color = colores.get(fase, '#CCCCCC')
-            
-            # Dibujar rectángulo
-            rect = Rectangle((evento['tiempo'], y_pos - 0.4), 
-                           evento['duracion'], 0.8,
-                           facecolor=color, edgecolor='black', linewidth=0.5)
-            ax.add_patch(rect)
-            
-            # Etiqueta (solo si la fase es suficientemente larga)
-            if evento['duracion'] > 5:
-                fase_corta = fase.replace('VERDE_', 'V_').replace('AMARILLO_', 'A_')
-                ax.text(evento['tiempo'] + evento['duracion']/2, y_pos,
-                       f"{fase_corta}\n{evento['duracion']:.0f}s",
-                       ha='center', va='center', fontsize=7, fontweight='bold')
-        
-        ax.set_xlabel('Tiempo (segundos)', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Ciclo del semáforo', fontsize=12, fontweight='bold')
-        ax.set_title(f'Diagrama de Gantt - Primeros {n_ciclos} Ciclos', 
-                    fontsize=13, fontweight='bold')
-        ax.set_yticks(range(n_ciclos))
-        ax.set_yticklabels([f'Ciclo {i+1}' for i in range(n_ciclos)])
-        ax.grid(True, axis='x', alpha=0.3)
-        
-        # Leyenda
-        from matplotlib.patches import Patch
-        legend_elements = [
-            Patch(facecolor='#4CAF50', label='Verde Vehicular'),
-            Patch(facecolor='#FFC107', label='Amarillo Vehicular'),
-            Patch(facecolor='#E91E63', label='Verde Peatonal'),
-            Patch(facecolor='#FF9800', label='Amarillo Peatonal')
-        ]
-        ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
+        return tiempos, duraciones, y_pos, fases, n_ciclos
+    
+    def _datos_metricas_por_ciclo(self):
+        if self.df_v.empty or 'ciclo' not in self.df_v.columns:
+            print("⚠️  No hay datos de ciclos")
+            return None
         
-        #.
+        # Solo se grafican los atendidos por ciclo: basta un conteo
+        return (*_atendidos_por_ciclo(self.df_v), *_atendidos_por_ciclo(self.df_p))
+    
+    def _graficar(self, nombre, guardar, **kwargs):
+        """Dibuja el gráfico nombre con los datos del visualizador."""
+        datos = getattr(self, f'_datos_{nombre}')(**kwargs)
+        if datos is None:
+            return None
         
+        fig = _DIBUJOS[nombre](*datos)
         if guardar:
-            path = os.path.join(self.directorio_salida, 'gantt_ciclos.png')
-            plt.savefig(path, dpi=300, bbox_inches='tight')
-            print(f"✅ Gráfico guardado: {path}")
+            self._guardar(fig, nombre)
         
         return fig
     
+    def graficar_series_temporales_colas(self, guardar=True):
+        """
+        Gráfico de series temporales de longitud de colas con cambios de fase.
+        """
+        return self._graficar('series_temporales_colas', guardar)
+    
+    def graficar_histogramas_espera(self, guardar=True):
+        """
+        Histogramas de distribución de tiempos de espera.
+        """
+        return self._graficar('histogramas_espera', guardar)
+    
+    def graficar_cdf_espera(self, guardar=True):
+        """
+        Funciones de distribución acumulada (CDF) de tiempos de espera.
+        """
+        return self._graficar('cdf_espera', guardar)
+    
+    def graficar_gantt_ciclos(self, n_ciclos=10, guardar=True):
+        """
+        Diagrama de Gantt mostrando fases del semáforo por ciclo.
+        """
+        return self._graficar('gantt_ciclos', guardar, n_ciclos=n_ciclos)
+    
     def graficar_boxplot_espera(self, guardar=True):
         """
         Boxplots comparativos de tiempos de espera.
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        datos = []
-        etiquetas = []
-        
-        if not self.df_v.empty:
-            datos.append(self.df_v['tiempo_espera'].values)
-            etiquetas.append('Vehículos')
-        
-        if not self.df_p.empty:
-            datos.append(self.df_p['tiempo_espera'].values)
-            etiquetas.append('Peatones')
-        
-        if datos:
-            bp = ax.boxplot(datos, labels=etiquetas, patch_artist=True,
-                           showmeans=True, meanline=True)
-            
-            # Colores
-            colores = ['#2E86AB', '#A23B72']
-            for patch, color in zip(bp['boxes'], colores):
-                patch.set_facecolor(color)
-                patch.set_alpha(0.6)
-            
-            ax.set_ylabel('Tiempo de espera (segundos)', fontsize=12, fontweight='bold')
-            ax.set_title('Comparación de Tiempos de Espera', fontsize=13, fontweight='bold')
-            ax.grid(True, axis='y', alpha=0.3)
-        
-        #.
-        
-        if guardar:
-            path = os.path.join(self.directorio_salida, 'boxplot_espera.png')
-            plt.savefig(path, dpi=300, bbox_inches='tight')
-            print(f"✅ Gráfico guardado: {path}")
-        
-        return fig
+        return self._graficar('boxplot_espera', guardar)
     
     def graficar_metricas_por_ciclo(self, guardar=True):
         """
         Gráfico de métricas agregadas por ciclo.
         """
-        if self.df_v.empty or 'ciclo' not in self.df_v.columns:
-            print("⚠️  No hay datos de ciclos")
-            return None
-        
-        # Calcular métricas por ciclo
-        metricas_v = self.analizador.calcular_metricas_por_ciclo(self.df_v, "vehiculos")
-        metricas_p = self.analizador.calcular_metricas_por_ciclo(self.df_p, "peatones")
-        
-        fig, axes = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
-        
-        # Vehículos atendidos por ciclo
-        if not metricas_v.empty:
-            ax1 = axes[0]
-            ax1.bar(metricas_v['ciclo'], metricas_v['n_atendidos'], 
-                   color='#2E86AB', alpha=0.7, label='Vehículos')
-            ax1.set_ylabel('Vehículos atendidos', fontsize=11, fontweight='bold')
-            ax1.set_title('Vehículos y Peatones Atendidos por Ciclo', 
-                         fontsize=13, fontweight='bold')
-            ax1.legend()
-            ax1.grid(True, axis='y', alpha=0.3)
-        
-        # Peatones atendidos por ciclo
-        if not metricas_p.empty:
-            ax2 = axes[1]
-            ax2.bar(metricas_p['ciclo'], metricas_p['n_atendidos'], 
-                   color='#A23B72', alpha=0.7, label='Peatones')
-            ax2.set_xlabel('Ciclo', fontsize=11, fontweight='bold')
-            ax2.set_ylabel('Peatones atendidos', fontsize=11, fontweight='bold')
-            ax2.legend()
-            ax2.grid(True, axis='y', alpha=0.3)
-        
-        #.
-        
-        if guardar:
-            path = os.path.join(self.directorio_salida, 'metricas_por_ciclo.png')
-            plt.savefig(path, dpi=300, bbox_inches='tight')
-            print(f"✅ Gráfico guardado: {path}")
-        
-        return fig
+        return self._graficar('metricas_por_ciclo', guardar)
     
-    def generar_todas_visualizaciones(self):
+    # (gráfico, argumentos, mensaje de progreso)
+    _GRAFICOS = [
+        ('series_temporales_colas', {}, "📊 Generando series temporales de colas..."),
+        ('histogramas_espera', {}, "📊 Generando histogramas de espera..."),
+        ('cdf_espera', {}, "📊 Generando CDF de espera..."),
+        ('gantt_ciclos', {'n_ciclos': 5}, "📊 Generando diagrama de Gantt..."),
+        ('boxplot_espera', {}, "📊 Generando boxplot comparativo..."),
+        ('metricas_por_ciclo', {}, "📊 Generando métricas por ciclo...")
+    ]
+    
+    def generar_todas_visualizaciones(self, paralelo=False, max_workers=None, formato=None):
         """
         Genera todas las visualizaciones y las guarda.
+        
+        Los datos de cada gráfico se extraen en este proceso; a los procesos
+        de trabajo solo se envían esos arrays, no el visualizador.
+        
+        Parámetros:
+        -----------
+        paralelo : bool
+            Si es True, cada gráfico se renderiza en un proceso distinto
+            (los gráficos son independientes entre sí)
+        max_workers : int, optional
+            Número de procesos (por defecto, os.cpu_count())
+        formato : str, optional
+            'png' o 'webp' solo para esta llamada; por defecto, el formato
+            del visualizador
+        
+        Returns:
+        --------
+        list : Nombres de los archivos generados
         """
+        if formato is None:
+            formato = self.formato
+        elif formato not in PIL_KWARGS_FORMATO:
+            raise ValueError(f"Formato no soportado: {formato}")
+        
         print(f"\n{'='*70}")
         print(f"GENERANDO VISUALIZACIONES")
         print(f"{'='*70}\n")
         
-        graficos_generados = []
-        
-        # Series temporales
-        print("📊 Generando series temporales de colas...")
-        fig = self.graficar_series_temporales_colas()
-        if fig: 
-            graficos_generados.append('series_temporales_colas.png')
-            plt.close(fig)
-        
-        # Histogramas
-        print("📊 Generando histogramas de espera...")
-        fig = self.graficar_histogramas_espera()
-        if fig:
-            graficos_generados.append('histogramas_espera.png')
-            plt.close(fig)
-        
-        # CDF
-        print("📊 Generando CDF de espera...")
-        fig = self.graficar_cdf_espera()
-        if fig:
-            graficos_generados.append('cdf_espera.png')
-            plt.close(fig)
-        
-        # Gantt
-        print("📊 Generando diagrama de Gantt...")
-        fig = self.graficar_gantt_ciclos(n_ciclos=5)
-        if fig:
-            graficos_generados.append('gantt_ciclos.png')
-            plt.close(fig)
+        # (gráfico, datos, ruta de salida, formato) de cada gráfico con datos
+        tareas = []
+        for nombre, kwargs, mensaje in self._GRAFICOS:
+            print(mensaje)
+            datos = getattr(self, f'_datos_{nombre}')(**kwargs)
+            if datos is None:
+                continue
+            
+            path = os.path.join(self.directorio_salida, f'{nombre}.{formato}')
+            tareas.append((nombre, datos, path, formato))
+            if not paralelo:
+                _renderizar_grafico(*tareas[-1])
         
-        # Boxplot
-        print("📊 Generando boxplot comparativo...")
-        fig = self.graficar_boxplot_espera()
-        if fig:
-            graficos_generados.append('boxplot_espera.png')
-            plt.close(fig)
+        if paralelo:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=plt.switch_backend,
+                                     initargs=('Agg',)) as executor:
+                futuros = [executor.submit(_renderizar_grafico, *tarea) for tarea in tareas]
+                for futuro in futuros:
+                    futuro.result()
         
-        # Métricas por ciclo
-        print("📊 Generando métricas por ciclo...")
-        fig = self.graficar_metricas_por_ciclo()
-        if fig:
-            graficos_generados.append('metricas_por_ciclo.png')
-            plt.close(fig)
+        graficos_generados = [os.path.basename(path) for _, _, path, _ in tareas]
         
         print(f"\n{'='*70}")
         print(f"✅ {len(graficos_generados)} gráficos generados en:")
@@ -416,13 +623,13 @@ def comparar_visualizaciones(analizador_fijo, analizador_adaptativo, directorio_
     df_v_adapt = analizador_adaptativo.crear_df_servicios_vehiculos()
     df_p_adapt = analizador_adaptativo.crear_df_servicios_peatones()
     
-    # Comparación de histogramas
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    # Comparación de histogramas (la figura se reutiliza entre llamadas)
+    fig, axes = _figura_comparacion()
     
     # Vehículos - Fijo
     if not df_v_fijo.empty:
-        axes[0, 0].hist(df_v_fijo['tiempo_espera'], bins=30, color='#2E86AB', 
-                       alpha=0.6, label='Fijo', edgecolor='black')
+        _histograma(axes[0, 0], df_v_fijo['tiempo_espera'], bins=30, color='#2E86AB',
+                    alpha=0.6, label='Fijo', edgecolor='black')
         axes[0, 0].axvline(df_v_fijo['tiempo_espera'].mean(), color='red', 
                           linestyle='--', linewidth=2)
         axes[0, 0].set_title('Vehículos - FIJO', fontweight='bold')
@@ -431,8 +638,8 @@ def comparar_visualizaciones(analizador_fijo, analizador_adaptativo, directorio_
     
     # Vehículos - Adaptativo
     if not df_v_adapt.empty:
-        axes[0, 1].hist(df_v_adapt['tiempo_espera'], bins=30, color='#28A745', 
-                       alpha=0.6, label='Adaptativo', edgecolor='black')
+        _histograma(axes[0, 1], df_v_adapt['tiempo_espera'], bins=30, color='#28A745',
+                    alpha=0.6, label='Adaptativo', edgecolor='black')
         axes[0, 1].axvline(df_v_adapt['tiempo_espera'].mean(), color='red',
                           linestyle='--', linewidth=2)
         axes[0, 1].set_title('Vehículos - ADAPTATIVO', fontweight='bold')
@@ -440,8 +647,8 @@ def comparar_visualizaciones(analizador_fijo, analizador_adaptativo, directorio_
     
     # Peatones - Fijo
     if not df_p_fijo.empty:
-        axes[1, 0].hist(df_p_fijo['tiempo_espera'], bins=30, color='#A23B72',
-                       alpha=0.6, label='Fijo', edgecolor='black')
+        _histograma(axes[1, 0], df_p_fijo['tiempo_espera'], bins=30, color='#A23B72',
+                    alpha=0.6, label='Fijo', edgecolor='black')
         axes[1, 0].axvline(df_p_fijo['tiempo_espera'].mean(), color='red',
                           linestyle='--', linewidth=2)
         axes[1, 0].set_title('Peatones - FIJO', fontweight='bold')
@@ -451,21 +658,47 @@ def comparar_visualizaciones(analizador_fijo, analizador_adaptativo, directorio_
     
     # Peatones - Adaptativo
     if not df_p_adapt.empty:
-        axes[1, 1].hist(df_p_adapt['tiempo_espera'], bins=30, color='#FF6B9D',
-                       alpha=0.6, label='Adaptativo', edgecolor='black')
+        _histograma(axes[1, 1], df_p_adapt['tiempo_espera'], bins=30, color='#FF6B9D',
+                    alpha=0.6, label='Adaptativo', edgecolor='black')
         axes[1, 1].axvline(df_p_adapt['tiempo_espera'].mean(), color='red',
                           linestyle='--', linewidth=2)
         axes[1, 1].set_title('Peatones - ADAPTATIVO', fontweight='bold')
         axes[1, 1].set_xlabel('Tiempo de espera (s)', fontweight='bold')
         axes[1, 1].grid(True, alpha=0.3)
     
-    plt.suptitle('Comparación: Semáforo Fijo vs Adaptativo', 
+    fig.suptitle('Comparación: Semáforo Fijo vs Adaptativo', 
                 fontsize=15, fontweight='bold', y=1.00)
     #.
     
     path = os.path.join(directorio_salida, 'comparacion_fijo_vs_adaptativo.png')
-    plt.savefig(path, dpi=300, bbox_inches='tight')
+    fig.savefig(path, dpi=SAVEFIG_DPI, bbox_inches='tight', pil_kwargs=PNG_PIL_KWARGS)
     print(f"✅ Gráfico comparativo guardado: {path}")
-    plt.close()
     
-    return path
\ No newline at end of file
+    return path
+
+
+_figura_comparacion_cache = None
+
+
+def _figura_comparacion():
+    """
+    Devuelve la figura 2x2 de comparación, creándola solo la primera vez.
+    
+    En llamadas siguientes se limpian los ejes en lugar de construir una
+    figura nueva.
+    """
+    global _figura_comparacion_cache
+    if _figura_comparacion_cache is None:
+        _figura_comparacion_cache = plt.subplots(2, 2, figsize=(14, 10))
+    else:
+        for ax in _figura_comparacion_cache[1].flat:
+            ax.clear()
+    return _figura_comparacion_cache
+
+
+def reiniciar_figura_comparacion():
+    """Cierra y descarta la figura de comparación reutilizada."""
+    global _figura_comparacion_cache
+    if _figura_comparacion_cache is not None:
+        plt.close(_figura_comparacion_cache[0])
+        _figura_comparacion_cache = None
\ No newline at end of file
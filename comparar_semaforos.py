@@ -1,18 +1,36 @@
 """
 Script para comparar semáforo fijo vs adaptativo.
+
+Uso: python comparar_semaforos.py [--replicas N]
+
+Con --replicas N se ejecutan N réplicas independientes por controlador
+(semillas consecutivas desde CFG.semilla, en paralelo) y se informa la media
+de cada métrica con su intervalo de confianza del 95 %.
 """
 import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import *
+import numpy as np
+from scipy import stats
+
+from config import CFG, CACHE_DIR
 from test_semaforo_fijo import simular_semaforo_fijo
 from test_semaforo_adaptativo import simular_semaforo_adaptativo
+from simulacion.cache import simular_cacheado
+from simulacion.replicas import simular_replicas
+
+# Filas de las tablas de comparación: (etiqueta, grupo, métrica)
+FILAS_TABLA = [
+    ('Espera media vehículos (s)', 'vehiculos', 'espera_media'),
+    ('Percentil 95 vehículos (s)', 'vehiculos', 'percentil_95'),
+    ('Espera media peatones (s)', 'peatones', 'espera_media'),
+    ('Percentil 95 peatones (s)', 'peatones', 'percentil_95')
+]
 
 
 def comparar_controladores(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1, semilla=42):
     """
     Compara el desempeño de ambos controladores.
+    Los parámetros de control y el warm-up se leen de CFG en cada llamada.
     """
     print("\n" + "="*70)
     print("COMPARACIÓN: SEMÁFORO FIJO vs ADAPTATIVO")
@@ -20,79 +38,150 @@ def comparar_controladores(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1, semilla=
     
     # Ejecutar semáforo fijo
     print("\n[1/2] Ejecutando FIJO...")
-    _, metricas_fijo, _ = simular_semaforo_fijo(
+    _, metricas_fijo = simular_cacheado(
+        simular_semaforo_fijo,
+        CACHE_DIR,
         tiempo_sim=tiempo_sim,
         lambda_v=lambda_v,
         lambda_p=lambda_p,
-        g_v=G_V_FIJO,
-        g_p=G_P_FIJO,
-        s_v=S_V,
-        s_p=S_P,
-        warmup=T_WARMUP,
+        g_v=CFG.g_v_fijo,
+        g_p=CFG.g_p_fijo,
+        s_v=CFG.s_v,
+        s_p=CFG.s_p,
+        warmup=CFG.t_warmup,
         semilla=semilla,
         verbose=False
     )
     
     # Ejecutar semáforo adaptativo
     print("[2/2] Ejecutando ADAPTATIVO...")
-    _, metricas_adapt, _ = simular_semaforo_adaptativo(
+    _, metricas_adapt = simular_cacheado(
+        simular_semaforo_adaptativo,
+        CACHE_DIR,
         tiempo_sim=tiempo_sim,
         lambda_v=lambda_v,
         lambda_p=lambda_p,
-        g_min=G_MIN,
-        g_max=G_MAX,
-        g_p=G_P_FIJO,
-        s_v=S_V,
-        s_p=S_P,
-        t_v=T_V,
-        t_p=T_P,
-        b=B_EXTENSION,
-        w_max=W_MAX,
-        warmup=T_WARMUP,
+        g_min=CFG.g_min,
+        g_max=CFG.g_max,
+        g_p=CFG.g_p_fijo,
+        s_v=CFG.s_v,
+        s_p=CFG.s_p,
+        t_v=CFG.t_v,
+        t_p=CFG.t_p,
+        b=CFG.b_extension,
+        w_max=CFG.w_max,
+        warmup=CFG.t_warmup,
         semilla=semilla,
         verbose=False
     )
     
-    # Imprimir comparación
+    # Construir la tabla completa y escribirla de una vez
+    lineas = [
+        "\n" + "="*70,
+        "COMPARACIÓN DE RESULTADOS",
+        "="*70,
+        f"\n{'Métrica':<30} {'FIJO':>15} {'ADAPTATIVO':>15} {'Mejora':>10}",
+        "-"*70
+    ]
+    
+    for etiqueta, grupo, metrica in FILAS_TABLA:
+        if not (metricas_fijo[grupo] and metricas_adapt[grupo]):
+            continue
+        fijo = metricas_fijo[grupo][metrica]
+        adapt = metricas_adapt[grupo][metrica]
+        mejora = (fijo - adapt) / fijo * 100
+        lineas.append(f"{etiqueta:<30} {fijo:>15.2f} {adapt:>15.2f} {mejora:>9.1f}%")
+    
+    lineas.append("="*70)
+    lineas.append("\n✅ Comparación completada.\n")
+    print("\n".join(lineas))
+    
+    return metricas_fijo, metricas_adapt
+
+
+def _media_ic95(valores):
+    """Media y semiancho del intervalo de confianza t del 95 % (NaN con una sola réplica)."""
+    valores = np.asarray(valores, dtype=float)
+    media = valores.mean()
+    if len(valores) < 2:
+        return media, np.nan
+    semiancho = stats.t.ppf(0.975, len(valores) - 1) * stats.sem(valores)
+    return media, semiancho
+
+
+def comparar_replicas(semillas, tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1):
+    """
+    Compara ambos controladores sobre varias réplicas independientes,
+    una por semilla, repartidas entre procesos.
+    
+    Parámetros:
+    -----------
+    semillas : iterable of int
+        Semilla de cada réplica
+    tiempo_sim, lambda_v, lambda_p : float
+        Parámetros comunes a todas las réplicas
+    
+    Returns:
+    --------
+    dict : {'fijo': [metricas, ...], 'adaptativo': [metricas, ...]}
+    """
+    semillas = list(semillas)
     print("\n" + "="*70)
-    print("COMPARACIÓN DE RESULTADOS")
+    print(f"COMPARACIÓN CON RÉPLICAS: FIJO vs ADAPTATIVO ({len(semillas)} réplicas)")
     print("="*70)
     
-    print(f"\n{'Métrica':<30} {'FIJO':>15} {'ADAPTATIVO':>15} {'Mejora':>10}")
-    print("-"*70)
+    resultados = {}
+    for nombre, simular in (('fijo', simular_semaforo_fijo),
+                            ('adaptativo', simular_semaforo_adaptativo)):
+        print(f"Ejecutando {nombre.upper()}...")
+        replicas = simular_replicas(
+            simular,
+            semillas,
+            tiempo_sim=tiempo_sim,
+            lambda_v=lambda_v,
+            lambda_p=lambda_p,
+            warmup=CFG.t_warmup
+        )
+        resultados[nombre] = [metricas for _, metricas in replicas]
     
-    # Vehículos
-    if metricas_fijo['vehiculos'] and metricas_adapt['vehiculos']:
-        v_f = metricas_fijo['vehiculos']
-        v_a = metricas_adapt['vehiculos']
-        
-        mejora_espera_v = (v_f['espera_media'] - v_a['espera_media']) / v_f['espera_media'] * 100
-        mejora_p95_v = (v_f['percentil_95'] - v_a['percentil_95']) / v_f['percentil_95'] * 100
-        
-        print(f"{'Espera media vehículos (s)':<30} {v_f['espera_media']:>15.2f} {v_a['espera_media']:>15.2f} {mejora_espera_v:>9.1f}%")
-        print(f"{'Percentil 95 vehículos (s)':<30} {v_f['percentil_95']:>15.2f} {v_a['percentil_95']:>15.2f} {mejora_p95_v:>9.1f}%")
+    lineas = [
+        f"\n{'Métrica (media ± IC 95%)':<30} {'FIJO':>19} {'ADAPTATIVO':>19}",
+        "-"*70
+    ]
     
-    # Peatones
-    if metricas_fijo['peatones'] and metricas_adapt['peatones']:
-        p_f = metricas_fijo['peatones']
-        p_a = metricas_adapt['peatones']
-        
-        mejora_espera_p = (p_f['espera_media'] - p_a['espera_media']) / p_f['espera_media'] * 100
-        mejora_p95_p = (p_f['percentil_95'] - p_a['percentil_95']) / p_f['percentil_95'] * 100
-        
-        print(f"{'Espera media peatones (s)':<30} {p_f['espera_media']:>15.2f} {p_a['espera_media']:>15.2f} {mejora_espera_p:>9.1f}%")
-        print(f"{'Percentil 95 peatones (s)':<30} {p_f['percentil_95']:>15.2f} {p_a['percentil_95']:>15.2f} {mejora_p95_p:>9.1f}%")
+    for etiqueta, grupo, metrica in FILAS_TABLA:
+        celdas = []
+        for nombre in ('fijo', 'adaptativo'):
+            valores = [m[grupo][metrica] for m in resultados[nombre] if m[grupo]]
+            if not valores:
+                celdas.append(f"{'-':>19}")
+                continue
+            media, semiancho = _media_ic95(valores)
+            celdas.append(f"{f'{media:.2f} ± {semiancho:.2f}':>19}")
+        lineas.append(f"{etiqueta:<30} {celdas[0]} {celdas[1]}")
     
-    print("="*70)
-    print("\n✅ Comparación completada.\n")
+    lineas.append("="*70)
+    lineas.append("\n✅ Comparación con réplicas completada.\n")
+    print("\n".join(lineas))
     
-    return metricas_fijo, metricas_adapt
+    return resultados
 
 
 if __name__ == "__main__":
-    metricas_fijo, metricas_adapt = comparar_controladores(
-        tiempo_sim=T_SIM,
-        lambda_v=LAMBDA_V,
-        lambda_p=LAMBDA_P,
-        semilla=SEMILLA
-    )
\ No newline at end of file
+    argumentos = sys.argv[1:]
+    
+    if '--replicas' in argumentos:
+        n_replicas = int(argumentos[argumentos.index('--replicas') + 1])
+        comparar_replicas(
+            range(CFG.semilla, CFG.semilla + n_replicas),
+            tiempo_sim=CFG.t_sim,
+            lambda_v=CFG.lambda_v,
+            lambda_p=CFG.lambda_p
+        )
+    else:
+        metricas_fijo, metricas_adapt = comparar_controladores(
+            tiempo_sim=CFG.t_sim,
+            lambda_v=CFG.lambda_v,
+            lambda_p=CFG.lambda_p,
+            semilla=CFG.semilla
+        )
\ No newline at end of file
@@ -2,56 +2,100 @@
 Configuración centralizada del proyecto.
 """
 import os
+from dataclasses import dataclass
 
-# PARÁMETROS DE LLEGADAS (Procesos Poisson)
-LAMBDA_V = 0.3  # veh/seg → 1080 veh/hora
-LAMBDA_P = 0.1  # peat/seg → 360 peat/hora
 
-# PARÁMETROS DE SERVICIO
-S_V = 0.5  # veh/seg → 1800 veh/hora
-S_P = 1.0  # peat/seg → 3600 peat/hora
+@dataclass
+class Config:
+    """
+    Parámetros del sistema, modificables en tiempo de ejecución.
+    
+    Los valores por defecto de los campos son la única fuente de los
+    parámetros: las constantes del módulo (LAMBDA_V, G_MIN, ...) se derivan
+    de ellos. Quien necesite cambiar parámetros durante la ejecución (p. ej.
+    el dashboard) lee y escribe sobre la instancia compartida CFG.
+    """
+    # PARÁMETROS DE LLEGADAS (Procesos Poisson)
+    lambda_v: float = 0.3  # veh/seg → 1080 veh/hora
+    lambda_p: float = 0.1  # peat/seg → 360 peat/hora
+    
+    # PARÁMETROS DE SERVICIO
+    s_v: float = 0.5  # veh/seg → 1800 veh/hora
+    s_p: float = 1.0  # peat/seg → 3600 peat/hora
+    
+    # CONTROL SEMÁFORO FIJO
+    g_v_fijo: float = 30  # segundos
+    g_p_fijo: float = 15  # segundos
+    amarillo: float = 3   # segundos
+    
+    # CONTROL SEMÁFORO ADAPTATIVO
+    g_min: float = 20
+    g_max: float = 60
+    t_v: int = 5           # umbral cola vehicular
+    t_p: int = 3           # umbral cola peatonal
+    b_extension: float = 5
+    w_max: float = 90      # espera máxima peatonal
+    
+    # SIMULACIÓN
+    t_sim: float = 3600    # 1 hora
+    t_warmup: float = 300  # 5 minutos
+    semilla: int = 42
 
-# CONTROL SEMÁFORO FIJO
-G_V_FIJO = 30  # segundos
-G_P_FIJO = 15  # segundos
-AMARILLO = 3   # segundos
 
-# CONTROL SEMÁFORO ADAPTATIVO
-G_MIN = 20
-G_MAX = 60
-T_V = 5        # umbral cola vehicular
-T_P = 3        # umbral cola peatonal
-B_EXTENSION = 5
-W_MAX = 90     # espera máxima peatonal
+CFG = Config()
 
-# SIMULACIÓN
-T_SIM = 3600   # 1 hora
-T_WARMUP = 300 # 5 minutos
-SEMILLA = 42
+# Valores por defecto como constantes del módulo (para `from config import *`)
+LAMBDA_V = Config.lambda_v
+LAMBDA_P = Config.lambda_p
+S_V = Config.s_v
+S_P = Config.s_p
+G_V_FIJO = Config.g_v_fijo
+G_P_FIJO = Config.g_p_fijo
+AMARILLO = Config.amarillo
+G_MIN = Config.g_min
+G_MAX = Config.g_max
+T_V = Config.t_v
+T_P = Config.t_p
+B_EXTENSION = Config.b_extension
+W_MAX = Config.w_max
+T_SIM = Config.t_sim
+T_WARMUP = Config.t_warmup
+SEMILLA = Config.semilla
 
 # RUTAS
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RESULTADOS_DIR = os.path.join(BASE_DIR, 'resultados')
 CSV_DIR = os.path.join(RESULTADOS_DIR, 'csv')
 GRAFICOS_DIR = os.path.join(RESULTADOS_DIR, 'graficos')
+CACHE_DIR = os.path.join(RESULTADOS_DIR, 'cache')
+
+# Directorios ya verificados en este proceso
+_DIRECTORIOS_CREADOS = set()
+
+
+def asegurar_directorio(path):
+    """Crea el directorio (y sus padres) si hace falta; retorna el path."""
+    if path not in _DIRECTORIOS_CREADOS:
+        os.makedirs(path, exist_ok=True)
+        _DIRECTORIOS_CREADOS.add(path)
+    return path
 
-for directorio in [RESULTADOS_DIR, CSV_DIR, GRAFICOS_DIR]:
-    os.makedirs(directorio, exist_ok=True)
 
 def imprimir_config():
+    """Imprime los parámetros actuales de CFG."""
     print("="*70)
     print("CONFIGURACIÓN DEL SISTEMA")
     print("="*70)
     print(f"\nLLEGADAS:")
-    print(f"  λ_v = {LAMBDA_V} veh/seg ({LAMBDA_V*3600:.0f} veh/hora)")
-    print(f"  λ_p = {LAMBDA_P} peat/seg ({LAMBDA_P*3600:.0f} peat/hora)")
+    print(f"  λ_v = {CFG.lambda_v} veh/seg ({CFG.lambda_v*3600:.0f} veh/hora)")
+    print(f"  λ_p = {CFG.lambda_p} peat/seg ({CFG.lambda_p*3600:.0f} peat/hora)")
     print(f"\nSERVICIO:")
-    print(f"  s_v = {S_V} veh/seg | s_p = {S_P} peat/seg")
+    print(f"  s_v = {CFG.s_v} veh/seg | s_p = {CFG.s_p} peat/seg")
     print(f"\nCONTROL FIJO:")
-    print(f"  Verde veh: {G_V_FIJO}s | Verde peat: {G_P_FIJO}s")
+    print(f"  Verde veh: {CFG.g_v_fijo}s | Verde peat: {CFG.g_p_fijo}s")
     print(f"\nCONTROL ADAPTATIVO:")
-    print(f"  Rango: [{G_MIN}, {G_MAX}]s | T_v={T_V} | T_p={T_P} | b={B_EXTENSION}s")
-    print(f"\nSIMULACIÓN: {T_SIM}s (warm-up: {T_WARMUP}s)")
+    print(f"  Rango: [{CFG.g_min}, {CFG.g_max}]s | T_v={CFG.t_v} | T_p={CFG.t_p} | b={CFG.b_extension}s")
+    print(f"\nSIMULACIÓN: {CFG.t_sim}s (warm-up: {CFG.t_warmup}s)")
     print("="*70)
 
 if __name__ == "__main__":
@@ -1,13 +1,10 @@
 """
 Dashboard simple sin Jupyter usando matplotlib interactivo.
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from config import *
+from config import CFG, CACHE_DIR
 from test_semaforo_fijo import simular_semaforo_fijo
 from test_semaforo_adaptativo import simular_semaforo_adaptativo
+from simulacion.cache import simular_cacheado
 from analisis.metricas import AnalizadorMetricas, imprimir_resumen_metricas
 import matplotlib.pyplot as plt
 
@@ -42,20 +39,30 @@ def menu_interactivo():
         else:
             print("❌ Opción inválida")
 
-def ejecutar_fijo():
-    """Ejecuta simulación fija."""
-    print("\n🚀 Ejecutando FIJO...")
-    registros, _, _ = simular_semaforo_fijo(
-        tiempo_sim=1800,
-        lambda_v=LAMBDA_V,
-        lambda_p=LAMBDA_P,
-        warmup=180,
-        semilla=42,
+def _resumen_cacheado(simular, tiempo_sim=1800, warmup=180, semilla=42):
+    """
+    Simula un controlador (o reutiliza la simulación guardada en caché) y
+    calcula su resumen. El resumen se recalcula siempre: solo se cachean
+    los registros, con la clave completa de simular_cacheado.
+    """
+    registros, _ = simular_cacheado(
+        simular,
+        CACHE_DIR,
+        tiempo_sim=tiempo_sim,
+        lambda_v=CFG.lambda_v,
+        lambda_p=CFG.lambda_p,
+        warmup=warmup,
+        semilla=semilla,
         verbose=False
     )
     
-    analizador = AnalizadorMetricas(registros, 1800, 180)
-    resumen = analizador.generar_resumen_completo()
+    analizador = AnalizadorMetricas(registros, tiempo_sim, warmup)
+    return analizador.generar_resumen_completo()
+
+def ejecutar_fijo():
+    """Ejecuta simulación fija."""
+    print("\n🚀 Ejecutando FIJO...")
+    resumen = _resumen_cacheado(simular_semaforo_fijo)
     imprimir_resumen_metricas(resumen)
     
     input("\nPresiona ENTER para continuar...")
@@ -63,17 +70,7 @@ def ejecutar_fijo():
 def ejecutar_adaptativo():
     """Ejecuta simulación adaptativa."""
     print("\n🚀 Ejecutando ADAPTATIVO...")
-    registros, _, _ = simular_semaforo_adaptativo(
-        tiempo_sim=1800,
-        lambda_v=LAMBDA_V,
-        lambda_p=LAMBDA_P,
-        warmup=180,
-        semilla=42,
-        verbose=False
-    )
-    
-    analizador = AnalizadorMetricas(registros, 1800, 180)
-    resumen = analizador.generar_resumen_completo()
+    resumen = _resumen_cacheado(simular_semaforo_adaptativo)
     imprimir_resumen_metricas(resumen)
     
     input("\nPresiona ENTER para continuar...")
@@ -83,28 +80,26 @@ def comparar_ambos():
     print("\n⚡ COMPARANDO FIJO vs ADAPTATIVO...")
     
     from comparar_semaforos import comparar_controladores
-    comparar_controladores(tiempo_sim=1800, lambda_v=LAMBDA_V, lambda_p=LAMBDA_P)
+    comparar_controladores(tiempo_sim=1800, lambda_v=CFG.lambda_v, lambda_p=CFG.lambda_p)
     
     input("\nPresiona ENTER para continuar...")
 
 def cambiar_parametros():
     """Permite cambiar parámetros."""
-    global LAMBDA_V, LAMBDA_P
-    
     print("\n⚙️ CAMBIAR PARÁMETROS")
     print("="*70)
-    print(f"Actuales: λ_v={LAMBDA_V}, λ_p={LAMBDA_P}")
+    print(f"Actuales: λ_v={CFG.lambda_v}, λ_p={CFG.lambda_p}")
     
     try:
-        nuevo_v = input(f"\nNuevo λ_v (Enter para mantener {LAMBDA_V}): ").strip()
+        nuevo_v = input(f"\nNuevo λ_v (Enter para mantener {CFG.lambda_v}): ").strip()
         if nuevo_v:
-            LAMBDA_V = float(nuevo_v)
+            CFG.lambda_v = float(nuevo_v)
         
-        nuevo_p = input(f"Nuevo λ_p (Enter para mantener {LAMBDA_P}): ").strip()
+        nuevo_p = input(f"Nuevo λ_p (Enter para mantener {CFG.lambda_p}): ").strip()
         if nuevo_p:
-            LAMBDA_P = float(nuevo_p)
+            CFG.lambda_p = float(nuevo_p)
         
-        print(f"\n✅ Parámetros actualizados: λ_v={LAMBDA_V}, λ_p={LAMBDA_P}")
+        print(f"\n✅ Parámetros actualizados: λ_v={CFG.lambda_v}, λ_p={CFG.lambda_p}")
     except:
         print("❌ Error en los valores ingresados")
 
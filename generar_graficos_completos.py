@@ -1,78 +1,93 @@
 """
 Script para asegurar que se generen TODOS los gráficos.
 """
-import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Solo se guardan archivos: backend sin ventanas
 
 from config import *
 from test_semaforo_fijo import simular_semaforo_fijo
 from test_semaforo_adaptativo import simular_semaforo_adaptativo
+from simulacion.cache import simular_cacheado
 from analisis.metricas import AnalizadorMetricas
 from analisis.visualizaciones import VisualizadorSimulacion, comparar_visualizaciones
 
-print("\n" + "="*70)
-print("GENERACIÓN COMPLETA DE GRÁFICOS")
-print("="*70 + "\n")
-
-# 1. SEMÁFORO FIJO
-print("[1/3] Simulando y graficando FIJO...")
-registros_fijo, _, _ = simular_semaforo_fijo(
-    tiempo_sim=T_SIM,
-    lambda_v=LAMBDA_V,
-    lambda_p=LAMBDA_P,
-    warmup=T_WARMUP,
-    semilla=SEMILLA,
-    verbose=False
-)
-
-dir_fijo = os.path.join(GRAFICOS_DIR, 'fijo')
-os.makedirs(dir_fijo, exist_ok=True)
-analizador_fijo = AnalizadorMetricas(registros_fijo, T_SIM, T_WARMUP)
-visualizador_fijo = VisualizadorSimulacion(analizador_fijo, dir_fijo)
-visualizador_fijo.generar_todas_visualizaciones()
+# Escenarios independientes: se simulan y grafican en procesos separados
+ESCENARIOS = {
+    'fijo': simular_semaforo_fijo,
+    'adaptativo': simular_semaforo_adaptativo
+}
 
-# 2. SEMÁFORO ADAPTATIVO
-print("\n[2/3] Simulando y graficando ADAPTATIVO...")
-registros_adaptativo, _, _ = simular_semaforo_adaptativo(
-    tiempo_sim=T_SIM,
-    lambda_v=LAMBDA_V,
-    lambda_p=LAMBDA_P,
-    warmup=T_WARMUP,
-    semilla=SEMILLA,
-    verbose=False
-)
 
-dir_adaptativo = os.path.join(GRAFICOS_DIR, 'adaptativo')
-os.makedirs(dir_adaptativo, exist_ok=True)
-analizador_adaptativo = AnalizadorMetricas(registros_adaptativo, T_SIM, T_WARMUP)
-visualizador_adaptativo = VisualizadorSimulacion(analizador_adaptativo, dir_adaptativo)
-visualizador_adaptativo.generar_todas_visualizaciones()
+def ejecutar_escenario(nombre, directorio):
+    """
+    Simula un escenario (o reutiliza la simulación guardada en caché),
+    genera sus gráficos y retorna su analizador.
+    """
+    registros, _ = simular_cacheado(
+        ESCENARIOS[nombre],
+        CACHE_DIR,
+        tiempo_sim=T_SIM,
+        lambda_v=LAMBDA_V,
+        lambda_p=LAMBDA_P,
+        warmup=T_WARMUP,
+        semilla=SEMILLA,
+        verbose=False
+    )
+    
+    asegurar_directorio(directorio)
+    analizador = AnalizadorMetricas(registros, T_SIM, T_WARMUP)
+    visualizador = VisualizadorSimulacion(analizador, directorio)
+    visualizador.generar_todas_visualizaciones()
+    return analizador
 
-# 3. COMPARACIÓN
-print("\n[3/3] Generando gráfico COMPARATIVO...")
-dir_comparacion = os.path.join(GRAFICOS_DIR, 'comparacion')
-os.makedirs(dir_comparacion, exist_ok=True)
-comparar_visualizaciones(analizador_fijo, analizador_adaptativo, dir_comparacion)
 
-# RESUMEN
-print("\n" + "="*70)
-print("✅ GENERACIÓN COMPLETADA")
-print("="*70)
-print(f"\n📂 Verifica estas carpetas:")
-print(f"   1. {dir_fijo}")
-print(f"   2. {dir_adaptativo}")
-print(f"   3. {dir_comparacion}")
-print("\n" + "="*70 + "\n")
+def contar_imagenes(directorio, extension='.png'):
+    """Cuenta los archivos con la extensión dada sin construir una lista."""
+    return sum(1 for entrada in os.scandir(directorio) if entrada.name.endswith(extension))
 
-# Contar archivos
-import glob
-fijo_archivos = len(glob.glob(os.path.join(dir_fijo, "*.png")))
-adapt_archivos = len(glob.glob(os.path.join(dir_adaptativo, "*.png")))
-comp_archivos = len(glob.glob(os.path.join(dir_comparacion, "*.png")))
 
-print(f"📊 Archivos generados:")
-print(f"   Fijo:        {fijo_archivos} gráficos")
-print(f"   Adaptativo:  {adapt_archivos} gráficos")
-print(f"   Comparación: {comp_archivos} gráfico(s)")
-print(f"   TOTAL:       {fijo_archivos + adapt_archivos + comp_archivos} gráficos\n")
\ No newline at end of file
+if __name__ == "__main__":
+    print("\n" + "="*70)
+    print("GENERACIÓN COMPLETA DE GRÁFICOS")
+    print("="*70 + "\n")
+    
+    dir_fijo = os.path.join(GRAFICOS_DIR, 'fijo')
+    dir_adaptativo = os.path.join(GRAFICOS_DIR, 'adaptativo')
+    
+    # 1-2. SEMÁFORO FIJO Y ADAPTATIVO (en paralelo)
+    print("[1-2/3] Simulando y graficando FIJO y ADAPTATIVO en paralelo...")
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        futuro_fijo = executor.submit(ejecutar_escenario, 'fijo', dir_fijo)
+        futuro_adaptativo = executor.submit(ejecutar_escenario, 'adaptativo', dir_adaptativo)
+        analizador_fijo = futuro_fijo.result()
+        analizador_adaptativo = futuro_adaptativo.result()
+    
+    # 3. COMPARACIÓN
+    print("\n[3/3] Generando gráfico COMPARATIVO...")
+    dir_comparacion = os.path.join(GRAFICOS_DIR, 'comparacion')
+    asegurar_directorio(dir_comparacion)
+    comparar_visualizaciones(analizador_fijo, analizador_adaptativo, dir_comparacion)
+    
+    # RESUMEN
+    print("\n" + "="*70)
+    print("✅ GENERACIÓN COMPLETADA")
+    print("="*70)
+    print(f"\n📂 Verifica estas carpetas:")
+    print(f"   1. {dir_fijo}")
+    print(f"   2. {dir_adaptativo}")
+    print(f"   3. {dir_comparacion}")
+    print("\n" + "="*70 + "\n")
+    
+    # Contar archivos
+    fijo_archivos = contar_imagenes(dir_fijo)
+    adapt_archivos = contar_imagenes(dir_adaptativo)
+    comp_archivos = contar_imagenes(dir_comparacion)
+    
+    print(f"📊 Archivos generados:")
+    print(f"   Fijo:        {fijo_archivos} gráficos")
+    print(f"   Adaptativo:  {adapt_archivos} gráficos")
+    print(f"   Comparación: {comp_archivos} gráfico(s)")
+    print(f"   TOTAL:       {fijo_archivos + adapt_archivos + comp_archivos} gráficos\n")
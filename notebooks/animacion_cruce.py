@@ -4,23 +4,87 @@ Animación visual del cruce peatonal con vehículos y peatones.
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.patches import Rectangle, Circle
+from functools import cache
 import numpy as np
 import sys
 import os
 
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Raíz del proyecto (este script vive en notebooks/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import *
 from test_semaforo_adaptativo import simular_semaforo_adaptativo
 from analisis.metricas import AnalizadorMetricas
 
 
+@cache
+def _clase_writer_ffmpeg():
+    """
+    Clase del writer de video ffmpeg (None si no está disponible).
+    
+    Solo se cachea la clase: cada guardado crea su propia instancia, porque
+    un MovieWriter guarda estado (proceso, archivo y tamaño de cuadro).
+    """
+    if animation.writers.is_available('ffmpeg'):
+        return animation.writers['ffmpeg']
+    return None
+
+
+# Fases del semáforo y colores (vehicular, peatonal) de cada una
+FASES_ANIMACION = ['VERDE_VEHICULAR', 'AMARILLO_VEHICULAR', 'VERDE_PEATONAL', 'AMARILLO_PEATONAL']
+COLORES_SEMAFOROS = [
+    ('green', 'red'),
+    ('yellow', 'red'),
+    ('red', 'green'),
+    ('red', 'yellow')
+]
+
+
+def _dibujar_escena(ax):
+    """
+    Dibuja la parte estática del cruce (calles, semáforos y rótulos).
+    
+    Returns:
+    --------
+    tuple : (semaforo_v, semaforo_p, texto_tiempo, texto_fase, texto_colas),
+        los artistas que la animación actualiza
+    """
+    ax.set_xlim(-10, 10)
+    ax.set_ylim(-10, 10)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title('Cruce Peatonal en Tiempo Real', fontsize=14, fontweight='bold')
+    
+    # Dibujar calles
+    # Calle horizontal (vehículos)
+    ax.add_patch(Rectangle((-10, -2), 20, 4, facecolor='gray', alpha=0.3))
+    # Calle vertical (peatones)
+    ax.add_patch(Rectangle((-2, -10), 4, 20, facecolor='lightblue', alpha=0.3))
+    
+    # Semáforo vehicular
+    semaforo_v = Circle((6, 3), 0.5, color='red')
+    ax.add_patch(semaforo_v)
+    ax.text(6, 4.5, 'SEM V', ha='center', fontsize=9, fontweight='bold')
+    
+    # Semáforo peatonal
+    semaforo_p = Circle((3, 6), 0.5, color='red')
+    ax.add_patch(semaforo_p)
+    ax.text(3, 7.5, 'SEM P', ha='center', fontsize=9, fontweight='bold')
+    
+    # Textos informativos
+    texto_tiempo = ax.text(-9, 9, '', fontsize=12, fontweight='bold')
+    texto_fase = ax.text(-9, 8, '', fontsize=10)
+    texto_colas = ax.text(-9, 6.5, '', fontsize=10)
+    
+    return semaforo_v, semaforo_p, texto_tiempo, texto_fase, texto_colas
+
+
 class AnimacionCruce:
     """
     Clase para animar el cruce peatonal.
     """
     
-    def __init__(self, registros, duracion_animacion=30):
+    def __init__(self, registros, duracion_animacion=30, fps=10):
         """
         Parámetros:
         -----------
@@ -28,24 +92,67 @@ class AnimacionCruce:
             Registros de la simulación
         duracion_animacion : int
             Duración en segundos de la animación (tiempo simulado)
+        fps : int
+            Frames por segundo simulado; limita el número de frames
         """
         self.registros = registros
         self.duracion_animacion = duracion_animacion
+        self.fps = fps
         
-        # Extraer datos relevantes
-        self.df_estado = self._preparar_datos()
+        # Extraer datos relevantes (un array por columna)
+        self._preparar_datos()
         self.eventos = registros.get('eventos_semaforo', [])
+    
+    @property
+    def df_estado(self):
+        """Estados de cola que recorre la animación, como DataFrame."""
+        import pandas as pd
         
+        return pd.DataFrame({
+            'tiempo': self._t,
+            'cola_v': self._cv,
+            'cola_p': self._cp,
+            'fase': self._fase
+        })
+    
     def _preparar_datos(self):
-        """Prepara los datos para la animación."""
-        import pandas as pd
+        """Prepara los arrays de tiempo, colas y fase para la animación."""
+        estado = self.registros.get('estado_colas')
+        if hasattr(estado, 'columnas'):
+            columnas = estado.columnas()
+        else:
+            filas = estado or []
+            columnas = {
+                campo: np.array([fila[campo] for fila in filas])
+                for campo in ('tiempo', 'cola_v', 'cola_p', 'fase')
+            }
+        
+        tiempo = np.asarray(columnas['tiempo'], dtype=np.float64)
+        indices = np.flatnonzero(tiempo <= self.duracion_animacion)
+        tiempos = tiempo[indices]
         
-        if not self.registros.get('estado_colas'):
-            return pd.DataFrame()
+        # Reducir a una rejilla uniforme si hay más filas que frames útiles:
+        # cada instante toma el último estado registrado hasta ese momento
+        max_frames = int(self.duracion_animacion * self.fps)
+        if len(indices) > max_frames > 0:
+            rejilla = np.linspace(0, self.duracion_animacion, max_frames)
+            posiciones = np.searchsorted(tiempos, rejilla, side='right') - 1
+            validas = posiciones >= 0
+            tiempos = rejilla[validas]
+            indices = indices[posiciones[validas]]
         
-        df = pd.DataFrame(self.registros['estado_colas'])
-        df = df[df['tiempo'] <= self.duracion_animacion]
-        return df
+        self._t = tiempos
+        self._cv = np.asarray(columnas['cola_v'])[indices]
+        self._cp = np.asarray(columnas['cola_p'])[indices]
+        self._fase = np.asarray(columnas['fase'], dtype=object)[indices]
+        
+        # Código entero de fase (índice en FASES_ANIMACION, -1 si es desconocida)
+        fases_unicas, inversa = np.unique(self._fase.astype(str), return_inverse=True)
+        codigos = np.array([
+            FASES_ANIMACION.index(fase) if fase in FASES_ANIMACION else -1
+            for fase in fases_unicas
+        ], dtype=np.int64)
+        self._fase_codigo = codigos[inversa]
     
     def crear_animacion(self, intervalo=100, guardar=False, filename='animacion_cruce.mp4'):
         """
@@ -60,39 +167,14 @@ class AnimacionCruce:
         filename : str
             Nombre del archivo de salida
         """
-        if self.df_estado.empty:
+        if len(self._t) == 0:
             print("⚠️ No hay datos para animar")
             return None
         
         fig, (ax_cruce, ax_graficas) = plt.subplots(1, 2, figsize=(16, 6))
         
-        # Configurar eje del cruce
-        ax_cruce.set_xlim(-10, 10)
-        ax_cruce.set_ylim(-10, 10)
-        ax_cruce.set_aspect('equal')
-        ax_cruce.axis('off')
-        ax_cruce.set_title('Cruce Peatonal en Tiempo Real', fontsize=14, fontweight='bold')
-        
-        # Dibujar calles
-        # Calle horizontal (vehículos)
-        ax_cruce.add_patch(Rectangle((-10, -2), 20, 4, facecolor='gray', alpha=0.3))
-        # Calle vertical (peatones)
-        ax_cruce.add_patch(Rectangle((-2, -10), 4, 20, facecolor='lightblue', alpha=0.3))
-        
-        # Semáforo vehicular
-        semaforo_v = Circle((6, 3), 0.5, color='red')
-        ax_cruce.add_patch(semaforo_v)
-        ax_cruce.text(6, 4.5, 'SEM V', ha='center', fontsize=9, fontweight='bold')
-        
-        # Semáforo peatonal
-        semaforo_p = Circle((3, 6), 0.5, color='red')
-        ax_cruce.add_patch(semaforo_p)
-        ax_cruce.text(3, 7.5, 'SEM P', ha='center', fontsize=9, fontweight='bold')
-        
-        # Textos informativos
-        texto_tiempo = ax_cruce.text(-9, 9, '', fontsize=12, fontweight='bold')
-        texto_fase = ax_cruce.text(-9, 8, '', fontsize=10)
-        texto_colas = ax_cruce.text(-9, 6.5, '', fontsize=10)
+        # Escena estática del cruce
+        semaforo_v, semaforo_p, texto_tiempo, texto_fase, texto_colas = _dibujar_escena(ax_cruce)
         
         # Configurar eje de gráficas
         ax_graficas.set_xlabel('Tiempo (s)', fontweight='bold')
@@ -104,37 +186,45 @@ class AnimacionCruce:
         linea_p, = ax_graficas.plot([], [], 's-', color='#A23B72', label='Peatones', linewidth=2)
         ax_graficas.legend()
         
-        # Listas para almacenar histórico
-        tiempos = []
-        colas_v = []
-        colas_p = []
+        # Límites fijos: con blit los ejes no se redibujan en cada frame
+        max_cola = max(self._cv.max(), self._cp.max())
+        ax_graficas.set_xlim(0, max(self._t.max(), 10))
+        ax_graficas.set_ylim(0, max(max_cola, 5) + 2)
+        
+        # Marcadores para vehículos y peatones en espera (máximo 8 visibles):
+        # una colección por tipo; en cada frame solo cambian sus posiciones
+        posiciones = -8 + np.arange(8) * 0.8
+        posiciones_v = np.column_stack([posiciones + 0.3, np.zeros(8)])  # centro del vehículo
+        posiciones_p = np.column_stack([np.zeros(8), posiciones])
+        vehiculos_markers = ax_cruce.scatter([], [], marker='s', s=110, facecolor='blue',
+                                             edgecolor='darkblue', zorder=3)
+        peatones_markers = ax_cruce.scatter([], [], marker='o', s=70, facecolor='orange',
+                                            edgecolor='darkorange', zorder=3)
         
-        # Marcadores para vehículos y peatones en espera
-        vehiculos_markers = []
-        peatones_markers = []
+        # Artistas que cambian entre frames (necesario para blit)
+        artistas = (linea_v, linea_p, semaforo_v, semaforo_p,
+                    texto_tiempo, texto_fase, texto_colas,
+                    vehiculos_markers, peatones_markers)
         
         def init():
             """Inicialización de la animación."""
             linea_v.set_data([], [])
             linea_p.set_data([], [])
-            return linea_v, linea_p
+            vehiculos_markers.set_offsets(np.empty((0, 2)))
+            peatones_markers.set_offsets(np.empty((0, 2)))
+            return artistas
         
         def animate(frame):
             """Función de animación para cada frame."""
-            if frame >= len(self.df_estado):
-                return linea_v, linea_p
+            if frame >= len(self._t):
+                return artistas
             
             # Obtener datos del frame actual
-            fila = self.df_estado.iloc[frame]
-            tiempo_actual = fila['tiempo']
-            cola_v_actual = fila['cola_v']
-            cola_p_actual = fila['cola_p']
-            fase_actual = fila['fase']
-            
-            # Actualizar histórico
-            tiempos.append(tiempo_actual)
-            colas_v.append(cola_v_actual)
-            colas_p.append(cola_p_actual)
+            tiempo_actual = self._t[frame]
+            cola_v_actual = self._cv[frame]
+            cola_p_actual = self._cp[frame]
+            fase_actual = self._fase[frame]
+            codigo_fase = self._fase_codigo[frame]
             
             # Actualizar textos
             texto_tiempo.set_text(f't = {tiempo_actual:.1f}s')
@@ -142,56 +232,28 @@ class AnimacionCruce:
             texto_colas.set_text(f'Colas: V={cola_v_actual} | P={cola_p_actual}')
             
             # Actualizar color de semáforos
-            if 'VERDE_VEHICULAR' in fase_actual:
-                semaforo_v.set_color('green')
-                semaforo_p.set_color('red')
-            elif fase_actual == 'VERDE_PEATONAL':
-                semaforo_v.set_color('red')
-                semaforo_p.set_color('green')
-            elif 'AMARILLO' in fase_actual:
-                if 'VEHICULAR' in fase_actual:
-                    semaforo_v.set_color('yellow')
-                else:
-                    semaforo_p.set_color('yellow')
-            
-            # Limpiar marcadores anteriores
-            for marker in vehiculos_markers:
-                marker.remove()
-            for marker in peatones_markers:
-                marker.remove()
-            vehiculos_markers.clear()
-            peatones_markers.clear()
-            
-            # Dibujar vehículos en espera
-            for i in range(min(cola_v_actual, 8)):  # Máximo 8 visibles
-                x = -8 + i * 0.8
-                y = 0
-                vehiculo = Rectangle((x, y-0.3), 0.6, 0.6, facecolor='blue', edgecolor='darkblue')
-                ax_cruce.add_patch(vehiculo)
-                vehiculos_markers.append(vehiculo)
+            if codigo_fase >= 0:
+                color_v, color_p = COLORES_SEMAFOROS[codigo_fase]
+                semaforo_v.set_color(color_v)
+                semaforo_p.set_color(color_p)
             
-            # Dibujar peatones en espera
-            for i in range(min(cola_p_actual, 8)):  # Máximo 8 visibles
-                x = 0
-                y = -8 + i * 0.8
-                peaton = Circle((x, y), 0.25, facecolor='orange', edgecolor='darkorange')
-                ax_cruce.add_patch(peaton)
-                peatones_markers.append(peaton)
+            # Mostrar vehículos y peatones en espera
+            vehiculos_markers.set_offsets(posiciones_v[:cola_v_actual])
+            peatones_markers.set_offsets(posiciones_p[:cola_p_actual])
             
-            # Actualizar gráficas
-            linea_v.set_data(tiempos, colas_v)
-            linea_p.set_data(tiempos, colas_p)
-            ax_graficas.set_xlim(0, max(tiempos[-1], 10))
-            ax_graficas.set_ylim(0, max(max(colas_v + colas_p), 5) + 2)
+            # Actualizar gráficas con el histórico hasta este frame (vistas)
+            n = frame + 1
+            linea_v.set_data(self._t[:n], self._cv[:n])
+            linea_p.set_data(self._t[:n], self._cp[:n])
             
-            return linea_v, linea_p
+            return artistas
         
         # Crear animación
         anim = animation.FuncAnimation(
             fig, animate, init_func=init,
-            frames=len(self.df_estado),
+            frames=len(self._t),
             interval=intervalo,
-            blit=False,
+            blit=True,
             repeat=True
         )
         
@@ -199,13 +261,13 @@ class AnimacionCruce:
             print(f"💾 Guardando animación como {filename}...")
             print("   (Esto puede tardar varios minutos)")
             
-            # Intentar guardar como MP4 (requiere ffmpeg)
-            try:
-                Writer = animation.writers['ffmpeg']
-                writer = Writer(fps=10, metadata=dict(artist='SimPy'), bitrate=1800)
+            # Guardar como MP4 si ffmpeg está disponible
+            clase_writer = _clase_writer_ffmpeg()
+            if clase_writer is not None:
+                writer = clase_writer(fps=10, metadata=dict(artist='SimPy'), bitrate=1800)
                 anim.save(filename, writer=writer)
                 print(f"✅ Animación guardada: {filename}")
-            except:
+            else:
                 # Si falla, guardar como GIF
                 print("⚠️  FFmpeg no disponible, guardando como GIF...")
                 filename_gif = filename.replace('.mp4', '.gif')
@@ -271,7 +333,7 @@ def crear_animacion_completa(guardar=True):
     print("\nCreando y guardando animación...")
     animador = AnimacionCruce(registros, duracion_animacion=120)
     
-    output_path = os.path.join(GRAFICOS_DIR, 'animacion_cruce.mp4')
+    output_path = os.path.join(asegurar_directorio(GRAFICOS_DIR), 'animacion_cruce.mp4')
     anim = animador.crear_animacion(
         intervalo=100,
         guardar=guardar,
@@ -1,12 +1,19 @@
 """
 Paquete de simulación de cruce peatonal inteligente.
 """
-from .llegadas import GeneradorLlegadas, Vehiculo, Peaton, validar_proceso_poisson, imprimir_validacion
+from .llegadas import GeneradorLlegadas, validar_proceso_poisson, imprimir_validacion
+from .colas import ColaFIFO
+from .registros import RegistroColumnar
+from .cache import simular_cacheado
+from .replicas import simular_replicas, simular_en_paralelo
 
 __all__ = [
     'GeneradorLlegadas',
-    'Vehiculo',
-    'Peaton',
     'validar_proceso_poisson',
-    'imprimir_validacion'
+    'imprimir_validacion',
+    'ColaFIFO',
+    'RegistroColumnar',
+    'simular_cacheado',
+    'simular_replicas',
+    'simular_en_paralelo'
 ]
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Caché en disco de resultados de simulación.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+
+# Versión de los resultados cacheados. Se incrementa en cada cambio que
+# altere la salida de una simulación para la misma semilla: las entradas
+# escritas con otra versión dejan de coincidir y se vuelven a simular.
+VERSION_CACHE = 6
+
+
+def clave_parametros(*partes):
+    """Clave corta y estable para un conjunto de parámetros (incluye VERSION_CACHE)."""
+    partes = (VERSION_CACHE,) + partes
+    return hashlib.blake2b(repr(partes).encode(), digest_size=8).hexdigest()
+
+
+def guardar_pickle_atomico(objeto, path):
+    """
+    Serializa objeto en path escribiendo primero un archivo temporal en el
+    mismo directorio y reemplazando el destino al final, de modo que una
+    ejecución interrumpida nunca deja un .pkl truncado.
+    """
+    directorio = os.path.dirname(path) or '.'
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(objeto, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, path)
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+
+def simular_cacheado(simular, directorio_cache, **parametros):
+    """
+    Ejecuta simular(**parametros) y guarda en disco sus registros y métricas.
+    Si ya existe un resultado con la misma función y parámetros, lo carga
+    sin volver a simular.
+    
+    La clave se construye con todos los argumentos de simular, incluidos
+    sus valores por defecto: pasar explícitamente un valor por defecto
+    reutiliza la misma entrada, y cambiar un valor por defecto la invalida.
+    También incluye VERSION_CACHE.
+    
+    Parámetros:
+    -----------
+    simular : callable
+        Función de simulación que retorna (registros, metricas, semaforo)
+    directorio_cache : str
+        Directorio donde se guardan los resultados
+    **parametros :
+        Argumentos de la simulación (forman parte de la clave)
+    
+    Returns:
+    --------
+    tuple : (registros, metricas)
+    """
+    argumentos = inspect.signature(simular).bind(**parametros)
+    argumentos.apply_defaults()
+    
+    nombre = simular.__name__
+    clave = clave_parametros(nombre, sorted(argumentos.arguments.items()))
+    path = os.path.join(directorio_cache, f'{nombre}_{clave}.pkl')
+    
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    
+    registros, metricas, _ = simular(**parametros)
+    guardar_pickle_atomico((registros, metricas), path)
+    
+    return registros, metricas
@@ -0,0 +1,76 @@
+"""
+Colas de espera de la simulación.
+"""
+from collections import deque
+
+
+class ColaFIFO(deque):
+    """
+    Cola FIFO de agentes (deque) que avisa de cada llegada.
+    
+    Los agentes son tuplas (id, tiempo_llegada). Un servidor con la cola
+    vacía puede esperar el evento de esperar_llegada() en lugar de sondear
+    la cola periódicamente; append() dispara ese evento. Así un agente que
+    llega a una cola vacía durante su verde empieza a ser servido en el
+    mismo instante de su llegada (espera nula), sin demora de sondeo.
+    
+    Un agente que no alcanza a ser servido vuelve al final de la cola, así
+    que la cola no queda ordenada por llegada. Para leer en O(1) la llegada
+    más antigua (llegada_minima) se mantiene una deque monótona de tiempos
+    de llegada que append(), appendleft() y popleft() actualizan (los demás
+    métodos que modifican la deque no la actualizan).
+    """
+    
+    def __init__(self, env, agentes=()):
+        """
+        Parámetros:
+        -----------
+        env : simpy.Environment
+            Entorno de simulación
+        agentes : iterable
+            Agentes iniciales de la cola
+        """
+        super().__init__()
+        self.env = env
+        self._evento_llegada = None
+        # Tiempos de llegada no decrecientes: el primero es el mínimo de la cola
+        self._minimos = deque()
+        for agente in agentes:
+            self.append(agente)
+    
+    def append(self, agente):
+        """Agrega un agente al final y despierta a quien espere una llegada."""
+        super().append(agente)
+        
+        tiempo_llegada = agente[1]
+        minimos = self._minimos
+        while minimos and minimos[-1] > tiempo_llegada:
+            minimos.pop()
+        minimos.append(tiempo_llegada)
+        
+        if self._evento_llegada is not None:
+            evento, self._evento_llegada = self._evento_llegada, None
+            evento.succeed()
+    
+    def appendleft(self, agente):
+        """Agrega un agente al frente (sin avisar: lo usa el propio servidor)."""
+        super().appendleft(agente)
+        if not self._minimos or agente[1] <= self._minimos[0]:
+            self._minimos.appendleft(agente[1])
+    
+    def popleft(self):
+        """Retira el agente del frente."""
+        agente = super().popleft()
+        if agente[1] == self._minimos[0]:
+            self._minimos.popleft()
+        return agente
+    
+    def llegada_minima(self):
+        """Tiempo de llegada más antiguo entre los agentes en cola (None si está vacía)."""
+        return self._minimos[0] if self._minimos else None
+    
+    def esperar_llegada(self):
+        """Evento que se dispara con la próxima llegada a la cola."""
+        if self._evento_llegada is None:
+            self._evento_llegada = self.env.event()
+        return self._evento_llegada
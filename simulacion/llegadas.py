@@ -2,23 +2,22 @@
 Módulo de generación de llegadas con procesos Poisson.
 """
 import simpy
-import random
 import numpy as np
-from collections import namedtuple
 
-# Estructura para almacenar información de agentes
-Vehiculo = namedtuple('Vehiculo', ['id', 'tiempo_llegada'])
-Peaton = namedtuple('Peaton', ['id', 'tiempo_llegada'])
+from .muestreo import muestras_exponenciales
+from .registros import RegistroColumnar, CAMPOS_LLEGADAS_VEHICULOS, CAMPOS_LLEGADAS_PEATONES
 
 
 class GeneradorLlegadas:
     """
     Gestiona la generación de llegadas de vehículos y peatones
     siguiendo procesos Poisson independientes.
+    
+    Cada agente se encola como una tupla (id, tiempo_llegada).
     """
     
     def __init__(self, env, lambda_v, lambda_p, cola_vehiculos, cola_peatones, 
-                 registros, warmup_time=0):
+                 registros, warmup_time=0, rng=None, tamano_lote=1024):
         """
         Parámetros:
         -----------
@@ -28,14 +27,19 @@ class GeneradorLlegadas:
             Tasa de llegada de vehículos (veh/seg)
         lambda_p : float
             Tasa de llegada de peatones (peat/seg)
-        cola_vehiculos : simpy.Store
-            Cola donde se almacenan vehículos
-        cola_peatones : simpy.Store
-            Cola donde se almacenan peatones
+        cola_vehiculos : ColaFIFO
+            Cola FIFO donde se almacenan vehículos
+        cola_peatones : ColaFIFO
+            Cola FIFO donde se almacenan peatones
         registros : dict
             Diccionario para almacenar eventos
         warmup_time : float
             Tiempo de warm-up (no se registran datos)
+        rng : np.random.Generator, opcional
+            Generador de números aleatorios. Por defecto se usa el estado
+            global de np.random (reproducible con np.random.seed)
+        tamano_lote : int
+            Cantidad de tiempos entre llegadas muestreados por lote
         """
         self.env = env
         self.lambda_v = lambda_v
@@ -44,71 +48,101 @@ class GeneradorLlegadas:
         self.cola_peatones = cola_peatones
         self.registros = registros
         self.warmup_time = warmup_time
+        self.rng = np.random if rng is None else rng
+        self.tamano_lote = tamano_lote
         
         # Contadores
         self.vehiculo_id = 0
         self.peaton_id = 0
         
-        # Inicializar listas de registros
-        self.registros['llegadas_vehiculos'] = []
-        self.registros['llegadas_peatones'] = []
+        # Inicializar registros columnares
+        self.registros['llegadas_vehiculos'] = RegistroColumnar(CAMPOS_LLEGADAS_VEHICULOS)
+        self.registros['llegadas_peatones'] = RegistroColumnar(CAMPOS_LLEGADAS_PEATONES)
+        
+        # Tiempos de llegada precalculados (ver precalcular_llegadas)
+        self.tiempos_vehiculos = None
+        self.tiempos_peatones = None
+    
+    def _tiempos_poisson(self, tasa, tiempo_total):
+        """
+        Tiempos de llegada de un proceso Poisson en [0, tiempo_total]:
+        N ~ Poisson(tasa * tiempo_total) instantes uniformes ordenados.
+        """
+        n = self.rng.poisson(tasa * tiempo_total)
+        return np.sort(self.rng.uniform(0, tiempo_total, n))
+    
+    def precalcular_llegadas(self, tiempo_total):
+        """
+        Genera de una vez todos los tiempos de llegada hasta tiempo_total,
+        sin recorrer el bucle de eventos de SimPy. Los procesos generadores
+        reproducen luego estos tiempos en lugar de muestrear.
+        
+        Parámetros:
+        -----------
+        tiempo_total : float
+            Horizonte de la simulación (seg)
+        
+        Returns:
+        --------
+        tuple : (tiempos_vehiculos, tiempos_peatones) como np.ndarray ordenados
+        """
+        self.tiempos_vehiculos = self._tiempos_poisson(self.lambda_v, tiempo_total)
+        self.tiempos_peatones = self._tiempos_poisson(self.lambda_p, tiempo_total)
+        return self.tiempos_vehiculos, self.tiempos_peatones
+    
+    def _tiempos_entre_llegadas(self, tasa, tiempos_llegada=None):
+        """
+        Produce tiempos entre llegadas ~ Exponencial(tasa), muestreados
+        por lotes con numpy. Si se dan tiempos de llegada precalculados,
+        produce la espera hasta cada uno.
+        """
+        if tiempos_llegada is not None:
+            for tiempo in tiempos_llegada.tolist():
+                yield tiempo - self.env.now
+            return
+        
+        yield from muestras_exponenciales(self.rng, tasa, self.tamano_lote)
     
     def generar_vehiculos(self):
         """
         Proceso generador de llegadas de vehículos (Poisson).
         Los tiempos entre llegadas siguen distribución exponencial.
         """
-        while True:
-            # Tiempo entre llegadas ~ Exponencial(lambda_v)
-            tiempo_entre_llegadas = random.expovariate(self.lambda_v)
+        # Tiempo entre llegadas ~ Exponencial(lambda_v)
+        for tiempo_entre_llegadas in self._tiempos_entre_llegadas(self.lambda_v,
+                                                                  self.tiempos_vehiculos):
             yield self.env.timeout(tiempo_entre_llegadas)
             
-            # Crear nuevo vehículo
+            # Crear nuevo vehículo y agregarlo a la cola
             self.vehiculo_id += 1
-            vehiculo = Vehiculo(
-                id=self.vehiculo_id,
-                tiempo_llegada=self.env.now
-            )
-            
-            # Agregar a la cola
-            self.cola_vehiculos.put(vehiculo)
+            self.cola_vehiculos.append((self.vehiculo_id, self.env.now))
             
             # Registrar llegada (solo después del warm-up)
             if self.env.now >= self.warmup_time:
-                self.registros['llegadas_vehiculos'].append({
-                    'id': vehiculo.id,
-                    'tiempo': self.env.now,
-                    'cola_longitud': len(self.cola_vehiculos.items)
-                })
+                self.registros['llegadas_vehiculos'].agregar(
+                    self.vehiculo_id, self.env.now, len(self.cola_vehiculos)
+                )
     
     def generar_peatones(self):
         """
         Proceso generador de llegadas de peatones (Poisson).
         Los tiempos entre llegadas siguen distribución exponencial.
         """
-        while True:
-            # Tiempo entre llegadas ~ Exponencial(lambda_p)
-            tiempo_entre_llegadas = random.expovariate(self.lambda_p)
+        # Tiempo entre llegadas ~ Exponencial(lambda_p)
+        for tiempo_entre_llegadas in self._tiempos_entre_llegadas(self.lambda_p,
+                                                                  self.tiempos_peatones):
             yield self.env.timeout(tiempo_entre_llegadas)
             
-            # Crear nuevo peatón
+            # Crear nuevo peatón y agregarlo a la cola
             self.peaton_id += 1
-            peaton = Peaton(
-                id=self.peaton_id,
-                tiempo_llegada=self.env.now
-            )
-            
-            # Agregar a la cola
-            self.cola_peatones.put(peaton)
+            self.cola_peatones.append((self.peaton_id, self.env.now))
             
             # Registrar llegada (solo después del warm-up)
             if self.env.now >= self.warmup_time:
-                self.registros['llegadas_peatones'].append({
-                    'id': peaton.id,
-                    'tiempo': self.env.now,
-                    'cola_longitud': len(self.cola_peatones.items),
-                    'tiempo_espera_actual': 0  # Se actualizará cuando sea atendido
-                })
+                self.registros['llegadas_peatones'].agregar(
+                    self.peaton_id, self.env.now, len(self.cola_peatones),
+                    0  # tiempo_espera_actual: se actualizará cuando sea atendido
+                )
     
     def iniciar(self):
         """Inicia ambos procesos generadores."""
@@ -116,14 +150,31 @@ class GeneradorLlegadas:
         self.env.process(self.generar_peatones())
 
 
+def _estadisticas_inter_arribos(tiempos_llegada):
+    """
+    Media y desviación estándar de los tiempos entre llegadas.
+    
+    La media de las diferencias consecutivas se reduce a
+    (último - primero) / n, así que solo se recorre el arreglo de
+    diferencias para la desviación.
+    """
+    ordenados = np.sort(np.asarray(tiempos_llegada, dtype=np.float64))
+    n = len(ordenados) - 1
+    media = (ordenados[-1] - ordenados[0]) / n
+    desviaciones = np.diff(ordenados)
+    desviaciones -= media
+    std = np.sqrt(np.dot(desviaciones, desviaciones) / n)
+    return media, std
+
+
 def validar_proceso_poisson(tiempos_llegada, lambda_esperada, nombre="Proceso"):
     """
     Valida estadísticamente si un conjunto de llegadas sigue un proceso Poisson.
     
     Parámetros:
     -----------
-    tiempos_llegada : list
-        Lista de tiempos de llegada
+    tiempos_llegada : list or np.ndarray
+        Tiempos de llegada
     lambda_esperada : float
         Tasa esperada del proceso
     nombre : str
@@ -136,13 +187,8 @@ def validar_proceso_poisson(tiempos_llegada, lambda_esperada, nombre="Proceso"):
     if len(tiempos_llegada) < 2:
         return None
     
-    # Calcular tiempos entre llegadas
-    tiempos_llegada_sorted = sorted(tiempos_llegada)
-    inter_arribos = np.diff(tiempos_llegada_sorted)
-    
-    # Estadísticas
-    media_inter_arribos = np.mean(inter_arribos)
-    std_inter_arribos = np.std(inter_arribos)
+    # Estadísticas de los tiempos entre llegadas
+    media_inter_arribos, std_inter_arribos = _estadisticas_inter_arribos(tiempos_llegada)
     
     # Teórico: media = 1/lambda, std = 1/lambda
     media_teorica = 1 / lambda_esperada
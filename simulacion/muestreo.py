@@ -0,0 +1,24 @@
+"""
+Muestreo por lotes de variables aleatorias para la simulación.
+"""
+
+
+def muestras_exponenciales(rng, tasa, tamano_lote=1024):
+    """
+    Produce indefinidamente muestras ~ Exponencial(tasa).
+    
+    Las muestras se generan por lotes con una sola llamada a numpy y el
+    lote se renueva al agotarse.
+    
+    Parámetros:
+    -----------
+    rng : np.random.Generator o módulo np.random
+        Fuente de números aleatorios
+    tasa : float
+        Tasa de la distribución (media = 1/tasa)
+    tamano_lote : int
+        Cantidad de muestras generadas por lote
+    """
+    escala = 1.0 / tasa
+    while True:
+        yield from rng.exponential(escala, size=tamano_lote).tolist()
@@ -0,0 +1,135 @@
+"""
+Almacenamiento columnar de registros de la simulación.
+"""
+import numpy as np
+
+
+class RegistroColumnar:
+    """
+    Registro con una columna numpy preasignada por campo.
+    
+    Las filas se agregan con agregar(); cuando se llena la capacidad, las
+    columnas crecen al doble. columnas() devuelve vistas sin copia de la
+    parte usada, listas para construir un DataFrame.
+    """
+    
+    def __init__(self, campos, capacidad_inicial=1024):
+        """
+        Parámetros:
+        -----------
+        campos : list of (str, dtype)
+            Nombre y tipo de cada columna, en el orden de agregar()
+        capacidad_inicial : int
+            Filas reservadas inicialmente
+        """
+        self.nombres = [nombre for nombre, _ in campos]
+        self._datos = [np.empty(capacidad_inicial, dtype=tipo) for _, tipo in campos]
+        self._n = 0
+    
+    def agregar(self, *valores):
+        """Agrega una fila con un valor por columna."""
+        if self._n == len(self._datos[0]):
+            self._crecer()
+        n = self._n
+        for columna, valor in zip(self._datos, valores):
+            columna[n] = valor
+        self._n = n + 1
+    
+    def _crecer(self):
+        """Duplica la capacidad de todas las columnas."""
+        capacidad = max(1, 2 * len(self._datos[0]))
+        for i, columna in enumerate(self._datos):
+            nueva = np.empty(capacidad, dtype=columna.dtype)
+            nueva[:self._n] = columna[:self._n]
+            self._datos[i] = nueva
+    
+    def columnas(self):
+        """Retorna {nombre: array} con las filas registradas (vistas, sin copia)."""
+        return {
+            nombre: columna[:self._n]
+            for nombre, columna in zip(self.nombres, self._datos)
+        }
+    
+    def __getstate__(self):
+        """Al serializar solo se guardan las filas usadas, no la capacidad libre."""
+        estado = self.__dict__.copy()
+        estado['_datos'] = [columna[:self._n].copy() for columna in self._datos]
+        return estado
+    
+    def __len__(self):
+        return self._n
+    
+    def __iter__(self):
+        """Itera filas como dicts (compatibilidad con la lista de dicts)."""
+        columnas = [columna[:self._n].tolist() for columna in self._datos]
+        for fila in zip(*columnas):
+            yield dict(zip(self.nombres, fila))
+
+
+def columna(registro, nombre):
+    """
+    Retorna una columna de un registro como array, tanto si el registro es
+    columnar como si es la clásica lista de dicts.
+    """
+    if hasattr(registro, 'columnas'):
+        return registro.columnas()[nombre]
+    return np.array([fila[nombre] for fila in registro])
+
+
+# Esquemas de los registros columnares
+CAMPOS_ESTADO_COLAS = [
+    ('tiempo', np.float64),
+    ('cola_v', np.int64),
+    ('cola_p', np.int64),
+    ('fase', object)
+]
+
+CAMPOS_LLEGADAS_VEHICULOS = [
+    ('id', np.int64),
+    ('tiempo', np.float64),
+    ('cola_longitud', np.int64)
+]
+
+CAMPOS_LLEGADAS_PEATONES = [
+    ('id', np.int64),
+    ('tiempo', np.float64),
+    ('cola_longitud', np.int64),
+    ('tiempo_espera_actual', np.float64)
+]
+
+CAMPOS_SERVICIOS = [
+    ('id', np.int64),
+    ('tiempo_llegada', np.float64),
+    ('tiempo_inicio_servicio', np.float64),
+    ('tiempo_fin_servicio', np.float64),
+    ('tiempo_espera', np.float64),
+    ('tiempo_servicio', np.float64),
+    ('ciclo', np.int64)
+]
+
+CAMPOS_EVENTOS = [
+    ('tiempo', np.float64),
+    ('fase', object),
+    ('duracion', np.float64),
+    ('ciclo', np.int64),
+    ('cola_v', np.int64),
+    ('cola_p', np.int64)
+]
+
+# Eventos del semáforo adaptativo: columnas opcionales al final
+# (None / NaN en los eventos que no las usan)
+CAMPOS_EVENTOS_ADAPTATIVOS = CAMPOS_EVENTOS + [
+    ('extension', np.float64),
+    ('tiempo_total', np.float64),
+    ('motivo', object)
+]
+
+CAMPOS_DECISIONES = [
+    ('tiempo', np.float64),
+    ('ciclo', np.int64),
+    ('tipo', object),
+    ('motivo', object),
+    ('valor', object),
+    ('cola_v', np.int64),
+    ('cola_p', np.int64)
+]
@@ -0,0 +1,75 @@
+"""
+Ejecución en paralelo de réplicas Monte Carlo.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import simular_cacheado
+
+
+def _ejecutar_replica(simular, parametros):
+    """
+    Ejecuta una réplica en un proceso trabajador.
+    
+    El semáforo no se retorna: contiene el entorno de SimPy y sus
+    generadores, que no se pueden serializar entre procesos.
+    """
+    registros, metricas, _ = simular(**{**parametros, 'verbose': False})
+    return registros, metricas
+
+
+def simular_replicas(simular, semillas, max_workers=None, **parametros):
+    """
+    Ejecuta una réplica independiente de simular(**parametros) por semilla,
+    repartidas entre procesos.
+    
+    Cada réplica crea su propio entorno y siembra su generador, así que los
+    resultados coinciden con los de ejecutarlas una a una.
+    
+    Parámetros:
+    -----------
+    simular : callable
+        Función de simulación a nivel de módulo que acepta semilla y verbose
+        y retorna (registros, metricas, semaforo)
+    semillas : iterable of int
+        Semilla de cada réplica
+    max_workers : int or None
+        Procesos a usar (None = uno por núcleo)
+    **parametros :
+        Argumentos comunes a todas las réplicas
+    
+    Returns:
+    --------
+    list of tuple : (registros, metricas) de cada réplica, en el orden de semillas
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [
+            executor.submit(_ejecutar_replica, simular, {**parametros, 'semilla': semilla})
+            for semilla in semillas
+        ]
+        return [futuro.result() for futuro in futuros]
+
+
+def simular_en_paralelo(simulaciones, directorio_cache, **parametros):
+    """
+    Ejecuta varias simulaciones independientes con los mismos parámetros,
+    una por proceso, pasando cada una por la caché en disco.
+    
+    Parámetros:
+    -----------
+    simulaciones : list of callable
+        Funciones de simulación a nivel de módulo (p. ej. fijo y adaptativo)
+    directorio_cache : str
+        Directorio de la caché (ver simular_cacheado)
+    **parametros :
+        Argumentos comunes a todas las simulaciones
+    
+    Returns:
+    --------
+    list of tuple : (registros, metricas) de cada simulación, en orden
+    """
+    with ProcessPoolExecutor(max_workers=len(simulaciones)) as executor:
+        futuros = [
+            executor.submit(simular_cacheado, simular, directorio_cache, **parametros)
+            for simular in simulaciones
+        ]
+        return [futuro.result() for futuro in futuros]
@@ -2,8 +2,16 @@
 Implementación de semáforo con control adaptativo (inteligente).
 """
 import simpy
-import random
 import numpy as np
+from collections import Counter
+
+from .muestreo import muestras_exponenciales
+from .registros import (RegistroColumnar, columna, CAMPOS_ESTADO_COLAS,
+                        CAMPOS_EVENTOS_ADAPTATIVOS, CAMPOS_DECISIONES, CAMPOS_SERVICIOS)
+
+
+# Fases que cuentan como verde vehicular (inicial y extensiones)
+FASES_VERDE_VEHICULAR = ['VERDE_VEHICULAR_INICIAL', 'VERDE_VEHICULAR_EXTENSION']
 
 
 class SemaforoAdaptativo:
@@ -13,13 +21,14 @@ class SemaforoAdaptativo:
     
     def __init__(self, env, cola_vehiculos, cola_peatones, registros,
                  g_min, g_max, g_p_fijo, s_v, s_p, t_v, t_p, b_extension,
-                 w_max, amarillo=3, warmup_time=0):
+                 w_max, amarillo=3, warmup_time=0, rng=None,
+                 registrar_eventos=True, registrar_servicios=True, registrar_decisiones=True):
         """
         Parámetros:
         -----------
         env : simpy.Environment
-        cola_vehiculos : simpy.Store
-        cola_peatones : simpy.Store
+        cola_vehiculos : ColaFIFO
+        cola_peatones : ColaFIFO
         registros : dict
         g_min : float
             Duración mínima fase verde vehicular (segundos)
@@ -43,6 +52,16 @@ class SemaforoAdaptativo:
             Duración fase amarilla (segundos)
         warmup_time : float
             Tiempo de warm-up
+        rng : np.random.Generator, opcional
+            Generador de números aleatorios para los tiempos de servicio.
+            Por defecto se usa el estado global de np.random
+        registrar_eventos : bool
+            Registrar cambios de fase y estado de colas
+        registrar_servicios : bool
+            Registrar cada vehículo y peatón atendido
+        registrar_decisiones : bool
+            Registrar cada decisión del control adaptativo. Los conteos por
+            (tipo, motivo) se llevan siempre en registros['conteo_decisiones']
         """
         self.env = env
         self.cola_vehiculos = cola_vehiculos
@@ -60,64 +79,106 @@ class SemaforoAdaptativo:
         self.amarillo = amarillo
         self.warmup_time = warmup_time
         
+        # Tiempos de servicio ~ Exponencial(s), muestreados por lotes
+        self.rng = np.random if rng is None else rng
+        self._servicios_v = muestras_exponenciales(self.rng, s_v)
+        self._servicios_p = muestras_exponenciales(self.rng, s_p)
+        
         # Estado actual
         self.fase_actual = "VERDE_VEHICULAR"
         self.ciclo_numero = 0
         
         # Inicializar registros
-        self.registros['eventos_semaforo'] = []
-        self.registros['servicios_vehiculos'] = []
-        self.registros['servicios_peatones'] = []
-        self.registros['estado_colas'] = []
-        self.registros['decisiones_adaptativas'] = []
+        self.registros['eventos_semaforo'] = RegistroColumnar(CAMPOS_EVENTOS_ADAPTATIVOS)
+        self.registros['servicios_vehiculos'] = RegistroColumnar(CAMPOS_SERVICIOS)
+        self.registros['servicios_peatones'] = RegistroColumnar(CAMPOS_SERVICIOS)
+        self.registros['estado_colas'] = RegistroColumnar(CAMPOS_ESTADO_COLAS)
+        self.registros['decisiones_adaptativas'] = RegistroColumnar(CAMPOS_DECISIONES)
+        self.registros['conteo_decisiones'] = self.conteo_decisiones = Counter()
+        
+        # Registro: inactivo hasta terminar el warm-up, activado una sola vez
+        # por un evento en lugar de comparar env.now en cada registro
+        self._opciones_registro = (registrar_eventos, registrar_servicios, registrar_decisiones)
+        self._registro_eventos = self._registro_servicios = self._registro_decisiones = False
+        self._contando_decisiones = False
+        if env.now >= warmup_time:
+            self._activar_registro()
+        else:
+            env.timeout(warmup_time - env.now).callbacks.append(self._activar_registro)
     
-    def registrar_evento(self, fase, duracion, info_adicional=None):
-        """Registra un cambio de fase del semáforo."""
-        if self.env.now >= self.warmup_time:
-            evento = {
-                'tiempo': self.env.now,
-                'fase': fase,
-                'duracion': duracion,
-                'ciclo': self.ciclo_numero,
-                'cola_v': len(self.cola_vehiculos.items),
-                'cola_p': len(self.cola_peatones.items)
-            }
-            if info_adicional:
-                evento.update(info_adicional)
-            self.registros['eventos_semaforo'].append(evento)
+    def _activar_registro(self, _evento=None):
+        """Activa los registros habilitados al terminar el warm-up."""
+        (self._registro_eventos, self._registro_servicios,
+         self._registro_decisiones) = self._opciones_registro
+        self._contando_decisiones = True
+    
+    def registrar_evento(self, fase, duracion, info_adicional=None, *, cola_v=None, cola_p=None):
+        """
+        Registra un cambio de fase del semáforo.
+        
+        cola_v y cola_p permiten pasar longitudes de cola ya leídas por el
+        llamador; si se omiten se leen de las colas.
+        """
+        if self._registro_eventos:
+            info = info_adicional or {}
+            self.registros['eventos_semaforo'].agregar(
+                self.env.now,
+                fase,
+                duracion,
+                self.ciclo_numero,
+                len(self.cola_vehiculos) if cola_v is None else cola_v,
+                len(self.cola_peatones) if cola_p is None else cola_p,
+                info.get('extension', np.nan),
+                info.get('tiempo_total', np.nan),
+                info.get('motivo')
+            )
     
     def registrar_estado_cola(self):
         """Registra el estado actual de las colas."""
-        if self.env.now >= self.warmup_time:
-            self.registros['estado_colas'].append({
-                'tiempo': self.env.now,
-                'cola_v': len(self.cola_vehiculos.items),
-                'cola_p': len(self.cola_peatones.items),
-                'fase': self.fase_actual
-            })
+        if self._registro_eventos:
+            self.registros['estado_colas'].agregar(
+                self.env.now,
+                len(self.cola_vehiculos),
+                len(self.cola_peatones),
+                self.fase_actual
+            )
     
-    def registrar_decision(self, tipo, motivo, valor):
-        """Registra decisiones del control adaptativo."""
-        if self.env.now >= self.warmup_time:
-            self.registros['decisiones_adaptativas'].append({
-                'tiempo': self.env.now,
-                'ciclo': self.ciclo_numero,
-                'tipo': tipo,
-                'motivo': motivo,
-                'valor': valor,
-                'cola_v': len(self.cola_vehiculos.items),
-                'cola_p': len(self.cola_peatones.items)
-            })
+    def registrar_decision(self, tipo, motivo, /, colas=None, **valor):
+        """
+        Registra decisiones del control adaptativo.
+        
+        El detalle de la decisión se pasa como argumentos con nombre y se
+        guarda como dict en la columna 'valor' (solo si el registro completo
+        de decisiones está activo). colas = (cola_v, cola_p) permite pasar
+        longitudes ya leídas por el llamador; si se omite se leen de las colas.
+        """
+        if self._contando_decisiones:
+            self.conteo_decisiones[tipo, motivo] += 1
+            if self._registro_decisiones:
+                if colas is None:
+                    colas = (len(self.cola_vehiculos), len(self.cola_peatones))
+                self.registros['decisiones_adaptativas'].agregar(
+                    self.env.now,
+                    self.ciclo_numero,
+                    tipo,
+                    motivo,
+                    valor,
+                    *colas
+                )
     
     def obtener_espera_maxima_peatonal(self):
         """
         Calcula la espera máxima actual de los peatones en cola.
+        
+        Un peatón devuelto a la cola queda detrás de otros que llegaron
+        después, así que el que más espera no es necesariamente el primero:
+        la llegada más antigua se lee de la cola (ColaFIFO.llegada_minima).
         """
-        if len(self.cola_peatones.items) == 0:
+        tiempo_llegada = self.cola_peatones.llegada_minima()
+        if tiempo_llegada is None:
             return 0
         
-        esperas = [self.env.now - p.tiempo_llegada for p in self.cola_peatones.items]
-        return max(esperas)
+        return self.env.now - tiempo_llegada
     
     def atender_vehiculos(self, duracion):
         """
@@ -128,33 +189,31 @@ class SemaforoAdaptativo:
         vehiculos_atendidos = 0
         
         while self.env.now < tiempo_fin:
-            if len(self.cola_vehiculos.items) == 0:
-                yield self.env.timeout(min(1.0, tiempo_fin - self.env.now))
+            if len(self.cola_vehiculos) == 0:
+                yield self.env.any_of([
+                    self.env.timeout(tiempo_fin - self.env.now),
+                    self.cola_vehiculos.esperar_llegada()
+                ])
                 continue
             
-            vehiculo = yield self.cola_vehiculos.get()
-            tiempo_espera = self.env.now - vehiculo.tiempo_llegada
-            tiempo_servicio = random.expovariate(self.s_v)
+            vehiculo_id, tiempo_llegada = self.cola_vehiculos.popleft()
+            tiempo_espera = self.env.now - tiempo_llegada
+            tiempo_servicio = next(self._servicios_v)
             
             tiempo_restante = tiempo_fin - self.env.now
             if tiempo_servicio > tiempo_restante:
-                self.cola_vehiculos.put(vehiculo)
+                self.cola_vehiculos.append((vehiculo_id, tiempo_llegada))
                 yield self.env.timeout(tiempo_restante)
                 break
             
             yield self.env.timeout(tiempo_servicio)
             vehiculos_atendidos += 1
             
-            if self.env.now >= self.warmup_time:
-                self.registros['servicios_vehiculos'].append({
-                    'id': vehiculo.id,
-                    'tiempo_llegada': vehiculo.tiempo_llegada,
-                    'tiempo_inicio_servicio': self.env.now - tiempo_servicio,
-                    'tiempo_fin_servicio': self.env.now,
-                    'tiempo_espera': tiempo_espera,
-                    'tiempo_servicio': tiempo_servicio,
-                    'ciclo': self.ciclo_numero
-                })
+            if self._registro_servicios:
+                self.registros['servicios_vehiculos'].agregar(
+                    vehiculo_id, tiempo_llegada, self.env.now - tiempo_servicio, self.env.now,
+                    tiempo_espera, tiempo_servicio, self.ciclo_numero
+                )
         
         return vehiculos_atendidos
     
@@ -167,33 +226,31 @@ class SemaforoAdaptativo:
         peatones_atendidos = 0
         
         while self.env.now < tiempo_fin:
-            if len(self.cola_peatones.items) == 0:
-                yield self.env.timeout(min(1.0, tiempo_fin - self.env.now))
+            if len(self.cola_peatones) == 0:
+                yield self.env.any_of([
+                    self.env.timeout(tiempo_fin - self.env.now),
+                    self.cola_peatones.esperar_llegada()
+                ])
                 continue
             
-            peaton = yield self.cola_peatones.get()
-            tiempo_espera = self.env.now - peaton.tiempo_llegada
-            tiempo_servicio = random.expovariate(self.s_p)
+            peaton_id, tiempo_llegada = self.cola_peatones.popleft()
+            tiempo_espera = self.env.now - tiempo_llegada
+            tiempo_servicio = next(self._servicios_p)
             
             tiempo_restante = tiempo_fin - self.env.now
             if tiempo_servicio > tiempo_restante:
-                self.cola_peatones.put(peaton)
+                self.cola_peatones.append((peaton_id, tiempo_llegada))
                 yield self.env.timeout(tiempo_restante)
                 break
             
             yield self.env.timeout(tiempo_servicio)
             peatones_atendidos += 1
             
-            if self.env.now >= self.warmup_time:
-                self.registros['servicios_peatones'].append({
-                    'id': peaton.id,
-                    'tiempo_llegada': peaton.tiempo_llegada,
-                    'tiempo_inicio_servicio': self.env.now - tiempo_servicio,
-                    'tiempo_fin_servicio': self.env.now,
-                    'tiempo_espera': tiempo_espera,
-                    'tiempo_servicio': tiempo_servicio,
-                    'ciclo': self.ciclo_numero
-                })
+            if self._registro_servicios:
+                self.registros['servicios_peatones'].agregar(
+                    peaton_id, tiempo_llegada, self.env.now - tiempo_servicio, self.env.now,
+                    tiempo_espera, tiempo_servicio, self.ciclo_numero
+                )
         
         return peatones_atendidos
     
@@ -212,8 +269,11 @@ class SemaforoAdaptativo:
         # Lógica de extensión
         extensiones = 0
         while tiempo_verde_total < self.g_max:
-            # Verificar condiciones para extensión
-            cola_actual_v = len(self.cola_vehiculos.items)
+            # Verificar condiciones para extensión (longitudes leídas una vez
+            # y reutilizadas en los registros de esta iteración)
+            cola_actual_v = len(self.cola_vehiculos)
+            cola_actual_p = len(self.cola_peatones)
+            colas = (cola_actual_v, cola_actual_p)
             espera_max_p = self.obtener_espera_maxima_peatonal()
             
             # Condición 1: Prioridad peatonal por espera excesiva
@@ -221,7 +281,9 @@ class SemaforoAdaptativo:
                 self.registrar_decision(
                     'FIN_EXTENSION',
                     'PRIORIDAD_PEATONAL',
-                    {'espera_max_p': espera_max_p, 'w_max': self.w_max}
+                    colas,
+                    espera_max_p=espera_max_p,
+                    w_max=self.w_max
                 )
                 break
             
@@ -230,7 +292,9 @@ class SemaforoAdaptativo:
                 self.registrar_decision(
                     'FIN_EXTENSION',
                     'COLA_VEHICULAR_BAJA',
-                    {'cola_v': cola_actual_v, 't_v': self.t_v}
+                    colas,
+                    cola_v=cola_actual_v,
+                    t_v=self.t_v
                 )
                 break
             
@@ -239,7 +303,9 @@ class SemaforoAdaptativo:
                 self.registrar_decision(
                     'FIN_EXTENSION',
                     'MAXIMO_ALCANZADO',
-                    {'tiempo_total': tiempo_verde_total, 'g_max': self.g_max}
+                    colas,
+                    tiempo_total=tiempo_verde_total,
+                    g_max=self.g_max
                 )
                 break
             
@@ -250,11 +316,15 @@ class SemaforoAdaptativo:
             self.registrar_decision(
                 'EXTENSION',
                 'ALTA_DEMANDA_VEHICULAR',
-                {'extension': extensiones, 'tiempo_total': tiempo_verde_total, 'cola_v': cola_actual_v}
+                colas,
+                extension=extensiones,
+                tiempo_total=tiempo_verde_total,
+                cola_v=cola_actual_v
             )
             
             self.registrar_evento("VERDE_VEHICULAR_EXTENSION", self.b_extension,
-                                 {'extension': extensiones, 'tiempo_total': tiempo_verde_total})
+                                 {'extension': extensiones, 'tiempo_total': tiempo_verde_total},
+                                 cola_v=cola_actual_v, cola_p=cola_actual_p)
             
             yield self.env.process(self.atender_vehiculos(self.b_extension))
         
@@ -264,7 +334,7 @@ class SemaforoAdaptativo:
         """
         Decide si se debe activar la fase peatonal.
         """
-        cola_p = len(self.cola_peatones.items)
+        cola_p = len(self.cola_peatones)
         espera_max_p = self.obtener_espera_maxima_peatonal()
         
         # Criterio 1: Hay suficientes peatones esperando
@@ -331,7 +401,7 @@ class SemaforoAdaptativo:
                 self.registrar_decision(
                     'SALTAR_FASE_PEATONAL',
                     motivo,
-                    {'cola_p': len(self.cola_peatones.items)}
+                    cola_p=len(self.cola_peatones)
                 )
             
             # Registrar estado al final del ciclo
@@ -351,51 +421,48 @@ def calcular_metricas_adaptativas(registros):
     # Métricas básicas
     metricas = calcular_metricas_basicas(registros)
     
-    # Métricas adaptativas adicionales
-    if registros['decisiones_adaptativas']:
+    # Métricas adaptativas adicionales, a partir de los conteos por
+    # (tipo, motivo); sin ellos se cuentan las decisiones registradas
+    conteo = registros.get('conteo_decisiones')
+    if conteo is None:
         decisiones = registros['decisiones_adaptativas']
-        
-        extensiones = [d for d in decisiones if d['tipo'] == 'EXTENSION']
-        fin_extensiones = [d for d in decisiones if d['tipo'] == 'FIN_EXTENSION']
+        conteo = Counter(zip(columna(decisiones, 'tipo').tolist(),
+                             columna(decisiones, 'motivo').tolist()))
+    
+    if conteo:
+        total_extensiones = sum(n for (tipo, _), n in conteo.items() if tipo == 'EXTENSION')
         
         metricas['adaptativo'] = {
-            'total_extensiones': len(extensiones),
-            'extensiones_por_ciclo': len(extensiones) / max(1, metricas['semaforo']['ciclos_completos']),
-            'motivos_fin': {}
+            'total_extensiones': total_extensiones,
+            'extensiones_por_ciclo': total_extensiones / max(1, metricas['semaforo']['ciclos_completos']),
+            # Motivos de finalización, en orden de primera aparición
+            'motivos_fin': {
+                motivo: n for (tipo, motivo), n in conteo.items() if tipo == 'FIN_EXTENSION'
+            }
         }
-        
-        # Contar motivos de finalización
-        for decision in fin_extensiones:
-            motivo = decision['motivo']
-            metricas['adaptativo']['motivos_fin'][motivo] = \
-                metricas['adaptativo']['motivos_fin'].get(motivo, 0) + 1
     else:
         metricas['adaptativo'] = None
     
     # Duración promedio de fase verde vehicular
     if registros['eventos_semaforo']:
-        eventos_v = [e for e in registros['eventos_semaforo'] 
-                     if 'VEHICULAR' in e['fase'] and e['fase'] != 'AMARILLO_VEHICULAR']
+        eventos = registros['eventos_semaforo']
+        # Filtro vectorizado por nombre exacto de fase
+        es_verde_v = np.isin(columna(eventos, 'fase'), FASES_VERDE_VEHICULAR)
         
-        if eventos_v:
-            # Agrupar por ciclo
-            duraciones_por_ciclo = {}
-            for evento in eventos_v:
-                ciclo = evento['ciclo']
-                if ciclo not in duraciones_por_ciclo:
-                    duraciones_por_ciclo[ciclo] = 0
-                duraciones_por_ciclo[ciclo] += evento['duracion']
-            
-            duraciones = list(duraciones_por_ciclo.values())
+        if es_verde_v.any():
+            # Agrupar por ciclo: suma de duraciones de los ciclos presentes
+            ciclos = columna(eventos, 'ciclo')[es_verde_v]
+            duraciones_por_ciclo = np.bincount(ciclos, weights=columna(eventos, 'duracion')[es_verde_v])
+            duraciones = duraciones_por_ciclo[np.bincount(ciclos) > 0]
             
             if not metricas['adaptativo']:
                 metricas['adaptativo'] = {}
             
             metricas['adaptativo']['duracion_verde_vehicular'] = {
-                'media': np.mean(duraciones),
-                'std': np.std(duraciones),
-                'min': np.min(duraciones),
-                'max': np.max(duraciones)
+                'media': duraciones.mean(),
+                'std': duraciones.std(),
+                'min': duraciones.min(),
+                'max': duraciones.max()
             }
     
     return metricas
@@ -403,34 +470,37 @@ def calcular_metricas_adaptativas(registros):
 
 def imprimir_metricas_adaptativas(metricas, titulo="MÉTRICAS - SEMÁFORO ADAPTATIVO"):
     """Imprime métricas del sistema adaptativo."""
-    from simulacion.semaforo_fijo import imprimir_metricas
+    from simulacion.semaforo_fijo import _lineas_metricas
     
-    # Imprimir métricas básicas
-    imprimir_metricas(metricas, titulo)
+    # Métricas básicas
+    lineas = _lineas_metricas(metricas, titulo)
     
-    # Imprimir métricas adaptativas
+    # Métricas adaptativas
     if metricas.get('adaptativo'):
-        print(f"{'='*70}")
-        print(f"MÉTRICAS ADAPTATIVAS")
-        print(f"{'='*70}")
+        lineas.append(f"{'='*70}")
+        lineas.append(f"MÉTRICAS ADAPTATIVAS")
+        lineas.append(f"{'='*70}")
         
         a = metricas['adaptativo']
         
         if 'total_extensiones' in a:
-            print(f"\n🎛️  EXTENSIONES:")
-            print(f"   Total:               {a['total_extensiones']}")
-            print(f"   Por ciclo (media):   {a['extensiones_por_ciclo']:.2f}")
+            lineas.append(f"\n🎛️  EXTENSIONES:")
+            lineas.append(f"   Total:               {a['total_extensiones']}")
+            lineas.append(f"   Por ciclo (media):   {a['extensiones_por_ciclo']:.2f}")
         
         if 'motivos_fin' in a:
-            print(f"\n📊 MOTIVOS DE FIN DE EXTENSIÓN:")
+            lineas.append(f"\n📊 MOTIVOS DE FIN DE EXTENSIÓN:")
             for motivo, count in a['motivos_fin'].items():
-                print(f"   {motivo:25s}: {count} veces")
+                lineas.append(f"   {motivo:25s}: {count} veces")
         
         if 'duracion_verde_vehicular' in a:
             d = a['duracion_verde_vehicular']
-            print(f"\n⏱️  DURACIÓN VERDE VEHICULAR:")
-            print(f"   Media:               {d['media']:.2f} seg")
-            print(f"   Desv. estándar:      {d['std']:.2f} seg")
-            print(f"   Rango:               [{d['min']:.0f}, {d['max']:.0f}] seg")
+            lineas.append(f"\n⏱️  DURACIÓN VERDE VEHICULAR:")
+            lineas.append(f"   Media:               {d['media']:.2f} seg")
+            lineas.append(f"   Desv. estándar:      {d['std']:.2f} seg")
+            lineas.append(f"   Rango:               [{d['min']:.0f}, {d['max']:.0f}] seg")
         
-        print(f"{'='*70}\n")
\ No newline at end of file
+        lineas.append(f"{'='*70}\n")
+    
+    # Reporte armado completo y escrito de una sola vez
+    print("\n".join(lineas))
@@ -2,12 +2,10 @@
 Implementación de semáforo con control de tiempos fijos.
 """
 import simpy
-import random
 import numpy as np
-from collections import namedtuple
 
-# Estructura para eventos del semáforo
-EventoSemaforo = namedtuple('EventoSemaforo', ['tiempo', 'fase', 'duracion'])
+from .muestreo import muestras_exponenciales
+from .registros import RegistroColumnar, columna, CAMPOS_ESTADO_COLAS, CAMPOS_EVENTOS, CAMPOS_SERVICIOS
 
 
 class SemaforoFijo:
@@ -17,13 +15,14 @@ class SemaforoFijo:
     """
     
     def __init__(self, env, cola_vehiculos, cola_peatones, registros,
-                 g_v_fijo, g_p_fijo, s_v, s_p, amarillo=3, warmup_time=0):
+                 g_v_fijo, g_p_fijo, s_v, s_p, amarillo=3, warmup_time=0, rng=None,
+                 registrar_eventos=True, registrar_servicios=True):
         """
         Parámetros:
         -----------
         env : simpy.Environment
-        cola_vehiculos : simpy.Store
-        cola_peatones : simpy.Store
+        cola_vehiculos : ColaFIFO
+        cola_peatones : ColaFIFO
         registros : dict
         g_v_fijo : float
             Duración fase verde vehicular (segundos)
@@ -37,6 +36,13 @@ class SemaforoFijo:
             Duración fase amarilla (segundos)
         warmup_time : float
             Tiempo de warm-up
+        rng : np.random.Generator, opcional
+            Generador de números aleatorios para los tiempos de servicio.
+            Por defecto se usa el estado global de np.random
+        registrar_eventos : bool
+            Registrar cambios de fase y estado de colas
+        registrar_servicios : bool
+            Registrar cada vehículo y peatón atendido
         """
         self.env = env
         self.cola_vehiculos = cola_vehiculos
@@ -49,37 +55,55 @@ class SemaforoFijo:
         self.amarillo = amarillo
         self.warmup_time = warmup_time
         
+        # Tiempos de servicio ~ Exponencial(s), muestreados por lotes
+        self.rng = np.random if rng is None else rng
+        self._servicios_v = muestras_exponenciales(self.rng, s_v)
+        self._servicios_p = muestras_exponenciales(self.rng, s_p)
+        
         # Estado actual
         self.fase_actual = "VERDE_VEHICULAR"  # Inicia con vehículos
         self.ciclo_numero = 0
         
         # Inicializar registros
-        self.registros['eventos_semaforo'] = []
-        self.registros['servicios_vehiculos'] = []
-        self.registros['servicios_peatones'] = []
-        self.registros['estado_colas'] = []
+        self.registros['eventos_semaforo'] = RegistroColumnar(CAMPOS_EVENTOS)
+        self.registros['servicios_vehiculos'] = RegistroColumnar(CAMPOS_SERVICIOS)
+        self.registros['servicios_peatones'] = RegistroColumnar(CAMPOS_SERVICIOS)
+        self.registros['estado_colas'] = RegistroColumnar(CAMPOS_ESTADO_COLAS)
+        
+        # Registro: inactivo hasta terminar el warm-up, activado una sola vez
+        # por un evento en lugar de comparar env.now en cada registro
+        self._opciones_registro = (registrar_eventos, registrar_servicios)
+        self._registro_eventos = self._registro_servicios = False
+        if env.now >= warmup_time:
+            self._activar_registro()
+        else:
+            env.timeout(warmup_time - env.now).callbacks.append(self._activar_registro)
+    
+    def _activar_registro(self, _evento=None):
+        """Activa los registros habilitados al terminar el warm-up."""
+        (self._registro_eventos, self._registro_servicios) = self._opciones_registro
     
     def registrar_evento(self, fase, duracion):
         """Registra un cambio de fase del semáforo."""
-        if self.env.now >= self.warmup_time:
-            self.registros['eventos_semaforo'].append({
-                'tiempo': self.env.now,
-                'fase': fase,
-                'duracion': duracion,
-                'ciclo': self.ciclo_numero,
-                'cola_v': len(self.cola_vehiculos.items),
-                'cola_p': len(self.cola_peatones.items)
-            })
+        if self._registro_eventos:
+            self.registros['eventos_semaforo'].agregar(
+                self.env.now,
+                fase,
+                duracion,
+                self.ciclo_numero,
+                len(self.cola_vehiculos),
+                len(self.cola_peatones)
+            )
     
     def registrar_estado_cola(self):
         """Registra el estado actual de las colas."""
-        if self.env.now >= self.warmup_time:
-            self.registros['estado_colas'].append({
-                'tiempo': self.env.now,
-                'cola_v': len(self.cola_vehiculos.items),
-                'cola_p': len(self.cola_peatones.items),
-                'fase': self.fase_actual
-            })
+        if self._registro_eventos:
+            self.registros['estado_colas'].agregar(
+                self.env.now,
+                len(self.cola_vehiculos),
+                len(self.cola_peatones),
+                self.fase_actual
+            )
     
     def atender_vehiculos(self, duracion):
         """
@@ -91,25 +115,28 @@ class SemaforoFijo:
         
         while self.env.now < tiempo_fin:
             # Verificar si hay vehículos en cola
-            if len(self.cola_vehiculos.items) == 0:
-                # No hay vehículos, esperar un poco
-                yield self.env.timeout(min(1.0, tiempo_fin - self.env.now))
+            if len(self.cola_vehiculos) == 0:
+                # No hay vehículos: esperar la próxima llegada o el fin de la fase
+                yield self.env.any_of([
+                    self.env.timeout(tiempo_fin - self.env.now),
+                    self.cola_vehiculos.esperar_llegada()
+                ])
                 continue
             
             # Obtener vehículo
-            vehiculo = yield self.cola_vehiculos.get()
+            vehiculo_id, tiempo_llegada = self.cola_vehiculos.popleft()
             
             # Calcular tiempo de espera
-            tiempo_espera = self.env.now - vehiculo.tiempo_llegada
+            tiempo_espera = self.env.now - tiempo_llegada
             
             # Tiempo de servicio (exponencial inversa de la tasa)
-            tiempo_servicio = random.expovariate(self.s_v)
+            tiempo_servicio = next(self._servicios_v)
             
             # Verificar si hay tiempo suficiente en esta fase
             tiempo_restante = tiempo_fin - self.env.now
             if tiempo_servicio > tiempo_restante:
                 # No alcanza el tiempo, devolver a la cola
-                self.cola_vehiculos.put(vehiculo)
+                self.cola_vehiculos.append((vehiculo_id, tiempo_llegada))
                 yield self.env.timeout(tiempo_restante)
                 break
             
@@ -118,16 +145,11 @@ class SemaforoFijo:
             vehiculos_atendidos += 1
             
             # Registrar servicio
-            if self.env.now >= self.warmup_time:
-                self.registros['servicios_vehiculos'].append({
-                    'id': vehiculo.id,
-                    'tiempo_llegada': vehiculo.tiempo_llegada,
-                    'tiempo_inicio_servicio': self.env.now - tiempo_servicio,
-                    'tiempo_fin_servicio': self.env.now,
-                    'tiempo_espera': tiempo_espera,
-                    'tiempo_servicio': tiempo_servicio,
-                    'ciclo': self.ciclo_numero
-                })
+            if self._registro_servicios:
+                self.registros['servicios_vehiculos'].agregar(
+                    vehiculo_id, tiempo_llegada, self.env.now - tiempo_servicio, self.env.now,
+                    tiempo_espera, tiempo_servicio, self.ciclo_numero
+                )
         
         return vehiculos_atendidos
     
@@ -141,25 +163,28 @@ class SemaforoFijo:
         
         while self.env.now < tiempo_fin:
             # Verificar si hay peatones en cola
-            if len(self.cola_peatones.items) == 0:
-                # No hay peatones, esperar un poco
-                yield self.env.timeout(min(1.0, tiempo_fin - self.env.now))
+            if len(self.cola_peatones) == 0:
+                # No hay peatones: esperar la próxima llegada o el fin de la fase
+                yield self.env.any_of([
+                    self.env.timeout(tiempo_fin - self.env.now),
+                    self.cola_peatones.esperar_llegada()
+                ])
                 continue
             
             # Obtener peatón
-            peaton = yield self.cola_peatones.get()
+            peaton_id, tiempo_llegada = self.cola_peatones.popleft()
             
             # Calcular tiempo de espera
-            tiempo_espera = self.env.now - peaton.tiempo_llegada
+            tiempo_espera = self.env.now - tiempo_llegada
             
             # Tiempo de servicio (exponencial inversa de la tasa)
-            tiempo_servicio = random.expovariate(self.s_p)
+            tiempo_servicio = next(self._servicios_p)
             
             # Verificar si hay tiempo suficiente en esta fase
             tiempo_restante = tiempo_fin - self.env.now
             if tiempo_servicio > tiempo_restante:
                 # No alcanza el tiempo, devolver a la cola
-                self.cola_peatones.put(peaton)
+                self.cola_peatones.append((peaton_id, tiempo_llegada))
                 yield self.env.timeout(tiempo_restante)
                 break
             
@@ -168,16 +193,11 @@ class SemaforoFijo:
             peatones_atendidos += 1
             
             # Registrar servicio
-            if self.env.now >= self.warmup_time:
-                self.registros['servicios_peatones'].append({
-                    'id': peaton.id,
-                    'tiempo_llegada': peaton.tiempo_llegada,
-                    'tiempo_inicio_servicio': self.env.now - tiempo_servicio,
-                    'tiempo_fin_servicio': self.env.now,
-                    'tiempo_espera': tiempo_espera,
-                    'tiempo_servicio': tiempo_servicio,
-                    'ciclo': self.ciclo_numero
-                })
+            if self._registro_servicios:
+                self.registros['servicios_peatones'].agregar(
+                    peaton_id, tiempo_llegada, self.env.now - tiempo_servicio, self.env.now,
+                    tiempo_espera, tiempo_servicio, self.ciclo_numero
+                )
         
         return peatones_atendidos
     
@@ -230,50 +250,51 @@ class SemaforoFijo:
         self.env.process(self.controlador())
 
 
+# Cuantiles de espera reportados (percentiles 50 y 95)
+_CUANTILES_BASICOS = np.array([0.50, 0.95])
+
+
+def _metricas_espera(servicios):
+    """
+    Estadísticas de espera de un registro de servicios (None si está vacío).
+    """
+    if not servicios:
+        return None
+    
+    esperas = columna(servicios, 'tiempo_espera')
+    percentil_50, percentil_95 = np.quantile(esperas, _CUANTILES_BASICOS)
+    
+    return {
+        'atendidos': len(esperas),
+        'espera_media': esperas.mean(),
+        'espera_std': esperas.std(),
+        'espera_max': esperas.max(),
+        'espera_min': esperas.min(),
+        'percentil_50': percentil_50,
+        'percentil_95': percentil_95
+    }
+
+
 def calcular_metricas_basicas(registros):
     """
     Calcula métricas básicas de desempeño del sistema.
     """
     metricas = {}
     
-    # Métricas de vehículos
-    if registros['servicios_vehiculos']:
-        esperas_v = [s['tiempo_espera'] for s in registros['servicios_vehiculos']]
-        metricas['vehiculos'] = {
-            'atendidos': len(esperas_v),
-            'espera_media': np.mean(esperas_v),
-            'espera_std': np.std(esperas_v),
-            'espera_max': np.max(esperas_v),
-            'espera_min': np.min(esperas_v),
-            'percentil_50': np.percentile(esperas_v, 50),
-            'percentil_95': np.percentile(esperas_v, 95)
-        }
-    else:
-        metricas['vehiculos'] = None
-    
-    # Métricas de peatones
-    if registros['servicios_peatones']:
-        esperas_p = [s['tiempo_espera'] for s in registros['servicios_peatones']]
-        metricas['peatones'] = {
-            'atendidos': len(esperas_p),
-            'espera_media': np.mean(esperas_p),
-            'espera_std': np.std(esperas_p),
-            'espera_max': np.max(esperas_p),
-            'espera_min': np.min(esperas_p),
-            'percentil_50': np.percentile(esperas_p, 50),
-            'percentil_95': np.percentile(esperas_p, 95)
-        }
-    else:
-        metricas['peatones'] = None
+    # Métricas de vehículos y peatones
+    metricas['vehiculos'] = _metricas_espera(registros['servicios_vehiculos'])
+    metricas['peatones'] = _metricas_espera(registros['servicios_peatones'])
     
     # Métricas del semáforo
     if registros['eventos_semaforo']:
         eventos = registros['eventos_semaforo']
-        ciclos_completos = max([e['ciclo'] for e in eventos])
+        fases = columna(eventos, 'fase')
+        duraciones = columna(eventos, 'duracion')
+        ciclos_completos = columna(eventos, 'ciclo').max()
         
         # Tiempo total en verde por tipo
-        tiempo_verde_v = sum([e['duracion'] for e in eventos if e['fase'] == 'VERDE_VEHICULAR'])
-        tiempo_verde_p = sum([e['duracion'] for e in eventos if e['fase'] == 'VERDE_PEATONAL'])
+        tiempo_verde_v = duraciones[fases == 'VERDE_VEHICULAR'].sum()
+        tiempo_verde_p = duraciones[fases == 'VERDE_PEATONAL'].sum()
         
         metricas['semaforo'] = {
             'ciclos_completos': ciclos_completos,
@@ -287,34 +308,43 @@ def calcular_metricas_basicas(registros):
     return metricas
 
 
-def imprimir_metricas(metricas, titulo="MÉTRICAS DEL SISTEMA"):
-    """Imprime métricas de forma legible."""
-    print(f"\n{'='*70}")
-    print(f"{titulo}")
-    print(f"{'='*70}")
+def _lineas_metricas(metricas, titulo):
+    """Líneas del reporte de métricas básicas (ver imprimir_metricas)."""
+    lineas = []
+    lineas.append(f"\n{'='*70}")
+    lineas.append(f"{titulo}")
+    lineas.append(f"{'='*70}")
     
     if metricas['vehiculos']:
         v = metricas['vehiculos']
-        print(f"\n🚗 VEHÍCULOS:")
-        print(f"   Atendidos:           {v['atendidos']}")
-        print(f"   Espera media:        {v['espera_media']:.2f} seg (σ={v['espera_std']:.2f})")
-        print(f"   Espera máxima:       {v['espera_max']:.2f} seg")
-        print(f"   Percentil 95:        {v['percentil_95']:.2f} seg")
+        lineas.append(f"\n🚗 VEHÍCULOS:")
+        lineas.append(f"   Atendidos:           {v['atendidos']}")
+        lineas.append(f"   Espera media:        {v['espera_media']:.2f} seg (σ={v['espera_std']:.2f})")
+        lineas.append(f"   Espera máxima:       {v['espera_max']:.2f} seg")
+        lineas.append(f"   Percentil 95:        {v['percentil_95']:.2f} seg")
     
     if metricas['peatones']:
         p = metricas['peatones']
-        print(f"\n🚶 PEATONES:")
-        print(f"   Atendidos:           {p['atendidos']}")
-        print(f"   Espera media:        {p['espera_media']:.2f} seg (σ={p['espera_std']:.2f})")
-        print(f"   Espera máxima:       {p['espera_max']:.2f} seg")
-        print(f"   Percentil 95:        {p['percentil_95']:.2f} seg")
+        lineas.append(f"\n🚶 PEATONES:")
+        lineas.append(f"   Atendidos:           {p['atendidos']}")
+        lineas.append(f"   Espera media:        {p['espera_media']:.2f} seg (σ={p['espera_std']:.2f})")
+        lineas.append(f"   Espera máxima:       {p['espera_max']:.2f} seg")
+        lineas.append(f"   Percentil 95:        {p['percentil_95']:.2f} seg")
     
     if metricas['semaforo']:
         s = metricas['semaforo']
-        print(f"\n🚦 SEMÁFORO:")
-        print(f"   Ciclos completos:    {s['ciclos_completos']}")
-        print(f"   Tiempo verde veh:    {s['tiempo_verde_vehicular']:.0f} seg")
-        print(f"   Tiempo verde peat:   {s['tiempo_verde_peatonal']:.0f} seg")
-        print(f"   Proporción verde V:  {s['proporcion_verde_v']*100:.1f}%")
+        lineas.append(f"\n🚦 SEMÁFORO:")
+        lineas.append(f"   Ciclos completos:    {s['ciclos_completos']}")
+        lineas.append(f"   Tiempo verde veh:    {s['tiempo_verde_vehicular']:.0f} seg")
+        lineas.append(f"   Tiempo verde peat:   {s['tiempo_verde_peatonal']:.0f} seg")
+        lineas.append(f"   Proporción verde V:  {s['proporcion_verde_v']*100:.1f}%")
     
-    print(f"{'='*70}\n")
\ No newline at end of file
+    lineas.append(f"{'='*70}\n")
+    
+    return lineas
+
+
+def imprimir_metricas(metricas, titulo="MÉTRICAS DEL SISTEMA"):
+    """Imprime métricas de forma legible."""
+    # Reporte armado completo y escrito de una sola vez
+    print("\n".join(_lineas_metricas(metricas, titulo)))
@@ -3,19 +3,15 @@ Script de demostración del módulo de llegadas.
 Ejecuta una simulación simple para verificar el funcionamiento.
 """
 import simpy
-import random
 import numpy as np
-import sys
-import os
-
-# Agregar directorio padre al path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import *
+from simulacion.colas import ColaFIFO
+from simulacion.registros import columna
 from simulacion.llegadas import GeneradorLlegadas, validar_proceso_poisson, imprimir_validacion
 
 
-def demo_llegadas(tiempo_sim=600, lambda_v=0.3, lambda_p=0.1, verbose=True):
+def demo_llegadas(tiempo_sim=600, lambda_v=0.3, lambda_p=0.1, verbose=True, validar=True):
     """
     Demuestra el funcionamiento del generador de llegadas.
     
@@ -29,17 +25,18 @@ def demo_llegadas(tiempo_sim=600, lambda_v=0.3, lambda_p=0.1, verbose=True):
         Tasa de llegada de peatones
     verbose : bool
         Si True, imprime eventos en tiempo real
+    validar : bool
+        Si True, valida estadísticamente ambos procesos de Poisson
     """
-    # Configurar semilla
-    random.seed(SEMILLA)
-    np.random.seed(SEMILLA)
+    # Generador aleatorio propio de esta corrida (sin estado global)
+    rng = np.random.default_rng(SEMILLA)
     
     # Crear entorno SimPy
     env = simpy.Environment()
     
-    # Crear colas (Store permite almacenar objetos)
-    cola_vehiculos = simpy.Store(env)
-    cola_peatones = simpy.Store(env)
+    # Crear colas (FIFO de agentes)
+    cola_vehiculos = ColaFIFO(env)
+    cola_peatones = ColaFIFO(env)
     
     # Diccionario para registros
     registros = {}
@@ -52,7 +49,8 @@ def demo_llegadas(tiempo_sim=600, lambda_v=0.3, lambda_p=0.1, verbose=True):
         cola_vehiculos=cola_vehiculos,
         cola_peatones=cola_peatones,
         registros=registros,
-        warmup_time=0  # Sin warm-up para esta demo
+        warmup_time=0,  # Sin warm-up para esta demo
+        rng=rng
     )
     
     # Iniciar generadores
@@ -63,8 +61,8 @@ def demo_llegadas(tiempo_sim=600, lambda_v=0.3, lambda_p=0.1, verbose=True):
         while True:
             yield env.timeout(60)
             if verbose:
-                print(f"⏱️  t={env.now:.0f}s | Veh en cola: {len(cola_vehiculos.items)} | "
-                      f"Peat en cola: {len(cola_peatones.items)}")
+                print(f"⏱️  t={env.now:.0f}s | Veh en cola: {len(cola_vehiculos)} | "
+                      f"Peat en cola: {len(cola_peatones)}")
     
     if verbose:
         env.process(monitor())
@@ -83,24 +81,61 @@ def demo_llegadas(tiempo_sim=600, lambda_v=0.3, lambda_p=0.1, verbose=True):
     print(f"{'='*70}")
     print(f"  Vehículos generados:      {len(registros['llegadas_vehiculos'])}")
     print(f"  Peatones generados:       {len(registros['llegadas_peatones'])}")
-    print(f"  Vehículos en cola final:  {len(cola_vehiculos.items)}")
-    print(f"  Peatones en cola final:   {len(cola_peatones.items)}")
+    print(f"  Vehículos en cola final:  {len(cola_vehiculos)}")
+    print(f"  Peatones en cola final:   {len(cola_peatones)}")
     print(f"{'='*70}\n")
     
-    # Validación estadística
-    if registros['llegadas_vehiculos']:
-        tiempos_v = [r['tiempo'] for r in registros['llegadas_vehiculos']]
+    # Validación estadística (columnas de tiempo como arrays, sin copia)
+    if validar and registros['llegadas_vehiculos']:
+        tiempos_v = columna(registros['llegadas_vehiculos'], 'tiempo')
         stats_v = validar_proceso_poisson(tiempos_v, lambda_v, "Vehículos")
         imprimir_validacion(stats_v)
     
-    if registros['llegadas_peatones']:
-        tiempos_p = [r['tiempo'] for r in registros['llegadas_peatones']]
+    if validar and registros['llegadas_peatones']:
+        tiempos_p = columna(registros['llegadas_peatones'], 'tiempo')
         stats_p = validar_proceso_poisson(tiempos_p, lambda_p, "Peatones")
         imprimir_validacion(stats_p)
     
     return registros, generador
 
 
+def validar_llegadas(tiempo_total=36000, lambda_v=0.3, lambda_p=0.1, semilla=SEMILLA):
+    """
+    Valida estadísticamente ambos procesos de Poisson sobre un horizonte
+    largo. Solo se necesitan los tiempos de llegada, así que se precalculan
+    de una vez (precalcular_llegadas) sin ejecutar el bucle de SimPy.
+    
+    Parámetros:
+    -----------
+    tiempo_total : float
+        Horizonte de los procesos en segundos
+    lambda_v : float
+        Tasa de llegada de vehículos
+    lambda_p : float
+        Tasa de llegada de peatones
+    semilla : int
+        Semilla del generador aleatorio
+    """
+    env = simpy.Environment()
+    generador = GeneradorLlegadas(
+        env=env,
+        lambda_v=lambda_v,
+        lambda_p=lambda_p,
+        cola_vehiculos=ColaFIFO(env),
+        cola_peatones=ColaFIFO(env),
+        registros={},
+        rng=np.random.default_rng(semilla)
+    )
+    tiempos_v, tiempos_p = generador.precalcular_llegadas(tiempo_total)
+    
+    stats_v = validar_proceso_poisson(tiempos_v, lambda_v, "Vehículos")
+    stats_p = validar_proceso_poisson(tiempos_p, lambda_p, "Peatones")
+    imprimir_validacion(stats_v)
+    imprimir_validacion(stats_p)
+    
+    return stats_v, stats_p
+
+
 if __name__ == "__main__":
     # Demo corta: 10 minutos
     print("\n" + "="*70)
@@ -111,7 +146,11 @@ if __name__ == "__main__":
         tiempo_sim=600,  # 10 minutos
         lambda_v=LAMBDA_V,
         lambda_p=LAMBDA_P,
-        verbose=False  # Cambiar a True para ver monitor
+        verbose=False,  # Cambiar a True para ver monitor
+        validar=False  # Muestra de 10 min demasiado pequeña para validar
     )
     
+    # Validación con un horizonte de 10 horas (tiempos precalculados)
+    validar_llegadas(tiempo_total=36000, lambda_v=LAMBDA_V, lambda_p=LAMBDA_P)
+    
     print("\n✅ Demo completada. Los generadores funcionan correctamente.\n")
\ No newline at end of file
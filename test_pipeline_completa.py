@@ -0,0 +1,38 @@
+"""
+Script que ejecuta el pipeline completo con una sola simulación por
+semáforo: análisis y exportación a CSV, comparación y visualizaciones.
+"""
+
+import matplotlib
+matplotlib.use('Agg')  # Solo se guardan archivos: backend sin ventanas
+
+from config import *
+from test_semaforo_fijo import simular_semaforo_fijo
+from test_semaforo_adaptativo import simular_semaforo_adaptativo
+from test_analisis_completo import (
+    PARAMETROS_SIMULACION,
+    analisis_completo_fijo,
+    analisis_completo_adaptativo,
+    comparar_resumenes
+)
+from test_visualizaciones import generar_visualizaciones_completas
+from simulacion.replicas import simular_en_paralelo
+
+
+if __name__ == "__main__":
+    # 1. Simular ambos semáforos una sola vez (en paralelo, o desde la caché)
+    (registros_fijo, _), (registros_adaptativo, _) = simular_en_paralelo(
+        [simular_semaforo_fijo, simular_semaforo_adaptativo],
+        CACHE_DIR,
+        **PARAMETROS_SIMULACION
+    )
+    
+    # 2. Análisis y exportación a CSV
+    analizador_fijo, resumen_fijo = analisis_completo_fijo(registros_fijo)
+    analizador_adaptativo, resumen_adaptativo = analisis_completo_adaptativo(registros_adaptativo)
+    comparar_resumenes(resumen_fijo, resumen_adaptativo)
+    
+    # 3. Visualizaciones con los mismos analizadores
+    generar_visualizaciones_completas(analizador_fijo, analizador_adaptativo)
+    
+    print("✅ Pipeline completo finalizado.\n")
@@ -1,16 +1,20 @@
 
 """
 Script de demostración del semáforo adaptativo.
+
+Uso: python test_semaforo_adaptativo.py [--sin-analisis]
+
+Con --sin-analisis solo se ejecuta la simulación y se informan los
+conteos crudos, sin calcular métricas ni registrar eventos ni
+decisiones; útil para medir el motor de eventos de SimPy (p. ej.
+ejecutándolo con pypy3, que acelera el bucle de eventos).
 """
 import simpy
-import random
 import numpy as np
 import sys
-import os
-
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import *
+from simulacion.colas import ColaFIFO
 from simulacion.llegadas import GeneradorLlegadas
 from simulacion.semaforo_adaptativo import (
     SemaforoAdaptativo, 
@@ -22,13 +26,17 @@ from simulacion.semaforo_adaptativo import (
 def simular_semaforo_adaptativo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
                                 g_min=20, g_max=60, g_p=15, s_v=0.5, s_p=1.0,
                                 t_v=5, t_p=3, b=5, w_max=90,
-                                warmup=300, semilla=42, verbose=True):
+                                warmup=300, semilla=42, verbose=True,
+                                analizar=True, registrar_eventos=True,
+                                registrar_servicios=True, registrar_decisiones=True):
     """
     Ejecuta simulación completa con semáforo adaptativo.
+    
+    registrar_eventos, registrar_servicios y registrar_decisiones se pasan
+    al semáforo: con False ese registro se omite por completo.
     """
-    # Configurar semilla
-    random.seed(semilla)
-    np.random.seed(semilla)
+    # Generador aleatorio propio de esta corrida (sin estado global)
+    rng = np.random.default_rng(semilla)
     
     if verbose:
         print(f"\n{'='*70}")
@@ -46,8 +54,8 @@ def simular_semaforo_adaptativo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
     env = simpy.Environment()
     
     # Crear colas
-    cola_vehiculos = simpy.Store(env)
-    cola_peatones = simpy.Store(env)
+    cola_vehiculos = ColaFIFO(env)
+    cola_peatones = ColaFIFO(env)
     
     # Diccionario de registros
     registros = {}
@@ -60,7 +68,8 @@ def simular_semaforo_adaptativo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
         cola_vehiculos=cola_vehiculos,
         cola_peatones=cola_peatones,
         registros=registros,
-        warmup_time=warmup
+        warmup_time=warmup,
+        rng=rng
     )
     generador.iniciar()
     
@@ -80,19 +89,22 @@ def simular_semaforo_adaptativo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
         b_extension=b,
         w_max=w_max,
         amarillo=AMARILLO,
-        warmup_time=warmup
+        warmup_time=warmup,
+        rng=rng,
+        registrar_eventos=registrar_eventos,
+        registrar_servicios=registrar_servicios,
+        registrar_decisiones=registrar_decisiones
     )
     semaforo.iniciar()
     
-    # Monitor (opcional)
-    def monitor():
-        while True:
-            yield env.timeout(300)  # Cada 5 minutos
-            if verbose:
-                print(f"⏱️  t={env.now:.0f}s | Cola V: {len(cola_vehiculos.items)} | "
-                      f"Cola P: {len(cola_peatones.items)} | Ciclo: {semaforo.ciclo_numero}")
-    
+    # Monitor (solo en modo verbose)
     if verbose:
+        def monitor():
+            while True:
+                yield env.timeout(300)  # Cada 5 minutos
+                print(f"⏱️  t={env.now:.0f}s | Cola V: {len(cola_vehiculos)} | "
+                      f"Cola P: {len(cola_peatones)} | Ciclo: {semaforo.ciclo_numero}")
+        
         env.process(monitor())
     
     # Ejecutar simulación
@@ -104,16 +116,18 @@ def simular_semaforo_adaptativo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
     if verbose:
         print(f"\n✅ Simulación completada\n")
     
-    # Calcular métricas
-    metricas = calcular_metricas_adaptativas(registros)
+    # Calcular métricas (analizar=False las omite: metricas = None)
+    metricas = calcular_metricas_adaptativas(registros) if analizar else None
     
-    if verbose:
+    if verbose and analizar:
         imprimir_metricas_adaptativas(metricas)
     
     return registros, metricas, semaforo
 
 
 if __name__ == "__main__":
+    analizar = '--sin-analisis' not in sys.argv[1:]
+    
     # Simulación con parámetros por defecto
     registros, metricas, semaforo = simular_semaforo_adaptativo(
         tiempo_sim=T_SIM,
@@ -130,7 +144,15 @@ if __name__ == "__main__":
         w_max=W_MAX,
         warmup=T_WARMUP,
         semilla=SEMILLA,
-        verbose=True
+        verbose=True,
+        analizar=analizar,
+        registrar_eventos=analizar,
+        registrar_decisiones=analizar
     )
     
+    if not analizar:
+        print(f"Vehículos atendidos: {len(registros['servicios_vehiculos'])} | "
+              f"Peatones atendidos: {len(registros['servicios_peatones'])} | "
+              f"Ciclos: {semaforo.ciclo_numero}\n")
+    
     print("✅ Simulación con semáforo adaptativo completada exitosamente.\n")
\ No newline at end of file
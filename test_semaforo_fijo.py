@@ -1,28 +1,36 @@
 """
 Script de demostración del semáforo con control fijo.
+
+Uso: python test_semaforo_fijo.py [--sin-analisis]
+
+Con --sin-analisis solo se ejecuta la simulación y se informan los
+conteos crudos, sin calcular métricas ni registrar eventos; útil para
+medir el motor de eventos de SimPy (p. ej. ejecutándolo con pypy3, que
+acelera el bucle de eventos).
 """
 import simpy
-import random
 import numpy as np
 import sys
-import os
-
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import *
+from simulacion.colas import ColaFIFO
 from simulacion.llegadas import GeneradorLlegadas
 from simulacion.semaforo_fijo import SemaforoFijo, calcular_metricas_basicas, imprimir_metricas
 
 
 def simular_semaforo_fijo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
                           g_v=30, g_p=15, s_v=0.5, s_p=1.0,
-                          warmup=300, semilla=42, verbose=True):
+                          warmup=300, semilla=42, verbose=True,
+                          analizar=True, registrar_eventos=True,
+                          registrar_servicios=True):
     """
     Ejecuta simulación completa con semáforo fijo.
+    
+    registrar_eventos y registrar_servicios se pasan al semáforo: con False
+    ese registro se omite por completo.
     """
-    # Configurar semilla
-    random.seed(semilla)
-    np.random.seed(semilla)
+    # Generador aleatorio propio de esta corrida (sin estado global)
+    rng = np.random.default_rng(semilla)
     
     if verbose:
         print(f"\n{'='*70}")
@@ -39,8 +47,8 @@ def simular_semaforo_fijo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
     env = simpy.Environment()
     
     # Crear colas
-    cola_vehiculos = simpy.Store(env)
-    cola_peatones = simpy.Store(env)
+    cola_vehiculos = ColaFIFO(env)
+    cola_peatones = ColaFIFO(env)
     
     # Diccionario de registros
     registros = {}
@@ -53,7 +61,8 @@ def simular_semaforo_fijo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
         cola_vehiculos=cola_vehiculos,
         cola_peatones=cola_peatones,
         registros=registros,
-        warmup_time=warmup
+        warmup_time=warmup,
+        rng=rng
     )
     generador.iniciar()
     
@@ -68,19 +77,21 @@ def simular_semaforo_fijo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
         s_v=s_v,
         s_p=s_p,
         amarillo=AMARILLO,
-        warmup_time=warmup
+        warmup_time=warmup,
+        rng=rng,
+        registrar_eventos=registrar_eventos,
+        registrar_servicios=registrar_servicios
     )
     semaforo.iniciar()
     
-    # Monitor (opcional)
-    def monitor():
-        while True:
-            yield env.timeout(300)  # Cada 5 minutos
-            if verbose:
-                print(f"⏱️  t={env.now:.0f}s | Cola V: {len(cola_vehiculos.items)} | "
-                      f"Cola P: {len(cola_peatones.items)} | Ciclo: {semaforo.ciclo_numero}")
-    
+    # Monitor (solo en modo verbose)
     if verbose:
+        def monitor():
+            while True:
+                yield env.timeout(300)  # Cada 5 minutos
+                print(f"⏱️  t={env.now:.0f}s | Cola V: {len(cola_vehiculos)} | "
+                      f"Cola P: {len(cola_peatones)} | Ciclo: {semaforo.ciclo_numero}")
+        
         env.process(monitor())
     
     # Ejecutar simulación
@@ -92,16 +103,18 @@ def simular_semaforo_fijo(tiempo_sim=3600, lambda_v=0.3, lambda_p=0.1,
     if verbose:
         print(f"\n✅ Simulación completada\n")
     
-    # Calcular métricas
-    metricas = calcular_metricas_basicas(registros)
+    # Calcular métricas (analizar=False las omite: metricas = None)
+    metricas = calcular_metricas_basicas(registros) if analizar else None
     
-    if verbose:
+    if verbose and analizar:
         imprimir_metricas(metricas, "RESULTADOS - SEMÁFORO FIJO")
     
     return registros, metricas, semaforo
 
 
 if __name__ == "__main__":
+    analizar = '--sin-analisis' not in sys.argv[1:]
+    
     # Simulación con parámetros por defecto
     registros, metricas, semaforo = simular_semaforo_fijo(
         tiempo_sim=T_SIM,
@@ -113,7 +126,14 @@ if __name__ == "__main__":
         s_p=S_P,
         warmup=T_WARMUP,
         semilla=SEMILLA,
-        verbose=True
+        verbose=True,
+        analizar=analizar,
+        registrar_eventos=analizar
     )
     
+    if not analizar:
+        print(f"Vehículos atendidos: {len(registros['servicios_vehiculos'])} | "
+              f"Peatones atendidos: {len(registros['servicios_peatones'])} | "
+              f"Ciclos: {semaforo.ciclo_numero}\n")
+    
     print("✅ Simulación con semáforo fijo completada exitosamente.\n")
\ No newline at end of file
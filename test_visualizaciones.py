@@ -1,50 +1,49 @@
 """
 Script para generar todas las visualizaciones.
 """
-import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use('Agg')  # Solo se guardan archivos: backend sin ventanas
 
 from config import *
 from test_semaforo_fijo import simular_semaforo_fijo
 from test_semaforo_adaptativo import simular_semaforo_adaptativo
+from simulacion.replicas import simular_en_paralelo
 from analisis.metricas import AnalizadorMetricas
 from analisis.visualizaciones import VisualizadorSimulacion, comparar_visualizaciones
 
 
-def generar_visualizaciones_completas():
+def generar_visualizaciones_completas(analizador_fijo=None, analizador_adaptativo=None):
     """
     Genera todas las visualizaciones para ambos controladores.
+    
+    Si se pasan los analizadores (p. ej. desde test_pipeline_completa.py)
+    se grafican directamente; si no, se simulan ambos semáforos. Los
+    gráficos de cada controlador se renderizan en paralelo (un proceso
+    por gráfico).
     """
     print("\n" + "="*70)
     print("GENERACIÓN DE VISUALIZACIONES COMPLETAS")
     print("="*70)
     
-    # Simular semáforo fijo
-    print("\n[1/2] Simulando semáforo FIJO...")
-    registros_fijo, _, _ = simular_semaforo_fijo(
-        tiempo_sim=T_SIM,
-        lambda_v=LAMBDA_V,
-        lambda_p=LAMBDA_P,
-        warmup=T_WARMUP,
-        semilla=SEMILLA,
-        verbose=False
-    )
-    
-    # Simular semáforo adaptativo
-    print("[2/2] Simulando semáforo ADAPTATIVO...")
-    registros_adaptativo, _, _ = simular_semaforo_adaptativo(
-        tiempo_sim=T_SIM,
-        lambda_v=LAMBDA_V,
-        lambda_p=LAMBDA_P,
-        warmup=T_WARMUP,
-        semilla=SEMILLA,
-        verbose=False
-    )
-    
-    # Crear analizadores
-    analizador_fijo = AnalizadorMetricas(registros_fijo, T_SIM, T_WARMUP)
-    analizador_adaptativo = AnalizadorMetricas(registros_adaptativo, T_SIM, T_WARMUP)
+    if analizador_fijo is None or analizador_adaptativo is None:
+        # Simular ambos semáforos en paralelo (o reutilizar la caché)
+        print("\nSimulando semáforos FIJO y ADAPTATIVO en paralelo...")
+        (registros_fijo, _), (registros_adaptativo, _) = simular_en_paralelo(
+            [simular_semaforo_fijo, simular_semaforo_adaptativo],
+            CACHE_DIR,
+            tiempo_sim=T_SIM,
+            lambda_v=LAMBDA_V,
+            lambda_p=LAMBDA_P,
+            warmup=T_WARMUP,
+            semilla=SEMILLA,
+            verbose=False
+        )
+        
+        # Crear analizadores
+        analizador_fijo = AnalizadorMetricas(registros_fijo, T_SIM, T_WARMUP)
+        analizador_adaptativo = AnalizadorMetricas(registros_adaptativo, T_SIM, T_WARMUP)
     
     # Visualizaciones semáforo fijo
     print("\n" + "="*70)
@@ -52,7 +51,7 @@ def generar_visualizaciones_completas():
     print("="*70)
     dir_fijo = os.path.join(GRAFICOS_DIR, 'fijo')
     visualizador_fijo = VisualizadorSimulacion(analizador_fijo, dir_fijo)
-    visualizador_fijo.generar_todas_visualizaciones()
+    visualizador_fijo.generar_todas_visualizaciones(paralelo=True)
     
     # Visualizaciones semáforo adaptativo
     print("\n" + "="*70)
@@ -60,7 +59,7 @@ def generar_visualizaciones_completas():
     print("="*70)
     dir_adaptativo = os.path.join(GRAFICOS_DIR, 'adaptativo')
     visualizador_adaptativo = VisualizadorSimulacion(analizador_adaptativo, dir_adaptativo)
-    visualizador_adaptativo.generar_todas_visualizaciones()
+    visualizador_adaptativo.generar_todas_visualizaciones(paralelo=True)
     
     # Comparación
     print("\n" + "="*70)